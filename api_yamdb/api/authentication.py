@@ -0,0 +1,128 @@
+"""JWT без обращения к БД на каждый запрос.
+
+Токен, выданный TokenApiView, несёт id, username, роль пользователя
+и версию его токенов. Права проверяются по этим полям, а строка User
+загружается, только когда нужен сам объект (например, автор отзыва).
+Изменение роли или удаление пользователя увеличивает версию, и старые
+токены перестают приниматься; версия берётся из кэша.
+
+Версия хранится в кэше TOKEN_VERSION_CACHE_TIMEOUT секунд. С общим
+кэшем отзыв действует сразу. С локальным кэшем процесса (LocMemCache)
+другие воркеры узнают о нём не позже этого срока, когда перечитают
+версию из БД. QuerySet.update() роли, is_superuser или is_active
+сигналов не вызывает: вместе с ними нужно увеличить и версию,
+update(role=..., token_version=F('token_version') + 1).
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+from .cache import get_cache
+
+# Версия в кэше для удалённого пользователя.
+DELETED = -1
+
+
+def token_version_key(user_id):
+    return f'api:token_version:{user_id}'
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя или None, если его нет.
+    При промахе кэша читается из БД."""
+    cache = get_cache()
+    version = cache.get(token_version_key(user_id))
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        version = DELETED if version is None else version
+        cache.add(
+            token_version_key(user_id), version,
+            settings.TOKEN_VERSION_CACHE_TIMEOUT,
+        )
+    return None if version == DELETED else version
+
+
+def set_token_version(user_id, version):
+    """Записывает версию в кэш после фиксации транзакции, чтобы
+    параллельный запрос не вернул в кэш прежнее значение из БД."""
+    transaction.on_commit(lambda: get_cache().set(
+        token_version_key(user_id), version,
+        settings.TOKEN_VERSION_CACHE_TIMEOUT,
+    ))
+
+
+def get_access_token(user):
+    token = AccessToken.for_user(user)
+    token['username'] = user.username
+    token['token_version'] = user.token_version
+    token.payload.update(user.token_claims())
+    return token
+
+
+def get_db_user(user):
+    """Объект User из БД для пользователя запроса."""
+    return getattr(user, 'db_user', user)
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь из полей токена с ролями, как у User."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @cached_property
+    def db_user(self):
+        return User.objects.get(pk=self.id)
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """Проверяет версию токена вместо загрузки пользователя.
+
+    Токены без роли (выданные не через TokenApiView) проверяются
+    обычным способом, с загрузкой пользователя из БД.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification'
+            )
+        version = get_token_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+        if (
+            version != validated_token.get('token_version')
+            or not validated_token.get('is_active', True)
+        ):
+            raise InvalidToken('Token has been revoked')
+        return RoleTokenUser(validated_token)
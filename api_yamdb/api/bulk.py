@@ -0,0 +1,186 @@
+"""Пакетная загрузка и обновление произведений.
+
+Все элементы проверяются за один проход, слаги жанров и категорий
+разрешаются одним запросом на таблицу, а произведения и их связи
+с жанрами записываются пачками в одной транзакции. Ошибка в одном
+элементе не мешает записать остальные: результат возвращается
+по каждому элементу.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from reviews.models import Category, Genre, Title
+from .cache import bump_version
+from .serializers import TitleBulkSerializer
+
+BATCH_SIZE = 500
+TITLE_FIELDS = ('name', 'year', 'description')
+
+
+class TitleBulkWriter:
+
+    def __init__(self, items, partial=False):
+        self.items = items
+        self.partial = partial
+        # Индекс элемента -> проверенные данные или ошибки.
+        self.valid = {}
+        self.errors = {}
+
+    def validate(self):
+        """Проверяет поля всех элементов, затем разрешает слаги
+        и (для обновления) произведения пакетом."""
+        child = TitleBulkSerializer(partial=self.partial)
+        for index, item in enumerate(self.items):
+            try:
+                self.valid[index] = child.run_validation(item)
+            except serializers.ValidationError as error:
+                self.errors[index] = error.detail
+        if self.partial:
+            self.reject_duplicates()
+        self.resolve_slugs()
+        if self.partial:
+            self.resolve_titles()
+
+    def reject(self, index, field, message):
+        del self.valid[index]
+        self.errors[index] = {field: [message]}
+
+    def reject_duplicates(self):
+        """Два изменения одного произведения в пакете противоречат
+        друг другу: отклоняются все такие элементы."""
+        indexes = defaultdict(list)
+        for index, data in self.valid.items():
+            indexes[data['id']].append(index)
+        for title_id, duplicates in indexes.items():
+            if len(duplicates) > 1:
+                for index in duplicates:
+                    self.reject(index, 'id', (
+                        f'Произведение {title_id} указано в пакете '
+                        'несколько раз.'
+                    ))
+
+    def resolve_slugs(self):
+        category_slugs = {
+            data['category'] for data in self.valid.values()
+            if 'category' in data
+        }
+        genre_slugs = {
+            slug for data in self.valid.values()
+            for slug in data.get('genre', ())
+        }
+        categories = dict(Category.objects.filter(
+            slug__in=category_slugs
+        ).values_list('slug', 'id'))
+        genres = dict(Genre.objects.filter(
+            slug__in=genre_slugs
+        ).values_list('slug', 'id'))
+        for index, data in list(self.valid.items()):
+            if 'category' in data:
+                if data['category'] not in categories:
+                    self.reject(index, 'category', (
+                        f'Категория {data["category"]} не найдена.'
+                    ))
+                    continue
+                data['category_id'] = categories[data['category']]
+            missing = [
+                slug for slug in data.get('genre', ()) if slug not in genres
+            ]
+            if missing:
+                self.reject(index, 'genre', (
+                    f'Жанры не найдены: {", ".join(missing)}.'
+                ))
+                continue
+            if 'genre' in data:
+                data['genre_ids'] = {genres[slug] for slug in data['genre']}
+
+    def resolve_titles(self):
+        self.titles = Title.objects.in_bulk(
+            {data['id'] for data in self.valid.values()}
+        )
+        for index, data in list(self.valid.items()):
+            if data['id'] not in self.titles:
+                self.reject(index, 'id', (
+                    f'Произведение {data["id"]} не найдено.'
+                ))
+
+    def save(self):
+        """Записывает проверенные элементы, возвращает результат
+        по каждому элементу в исходном порядке."""
+        if self.valid:
+            with transaction.atomic():
+                if self.partial:
+                    self.update()
+                else:
+                    self.create()
+                self.set_genres()
+            bump_version('titles')
+        status = 'updated' if self.partial else 'created'
+        return [
+            {'index': index, 'status': 'error',
+             'errors': self.errors[index]}
+            if index in self.errors else
+            {'index': index, 'status': status,
+             'id': self.valid[index]['title'].pk}
+            for index in range(len(self.items))
+        ]
+
+    def create(self):
+        titles = []
+        for data in self.valid.values():
+            data['title'] = Title(
+                category_id=data['category_id'],
+                **{field: data.get(field, '') for field in TITLE_FIELDS},
+            )
+            titles.append(data['title'])
+        if connection.features.can_return_rows_from_bulk_insert:
+            Title.objects.bulk_create(titles, batch_size=BATCH_SIZE)
+        elif connection.vendor == 'sqlite':
+            # SQLite не возвращает ключи из пакетной вставки. Писатель
+            # в SQLite один и держит блокировку до конца транзакции,
+            # поэтому новые строки — последние len(titles) ключей.
+            Title.objects.bulk_create(titles, batch_size=BATCH_SIZE)
+            pks = Title.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            )[:len(titles)]
+            for title, pk in zip(titles, reversed(list(pks))):
+                title.pk = pk
+        else:
+            # На других БД без RETURNING параллельные вставки могут
+            # перемежаться, а естественного ключа у произведения нет:
+            # ключи получаем вставкой по одному.
+            for title in titles:
+                title.save()
+
+    def update(self):
+        fields = set()
+        for data in self.valid.values():
+            data['title'] = title = self.titles[data['id']]
+            for field in TITLE_FIELDS:
+                if field in data:
+                    setattr(title, field, data[field])
+                    fields.add(field)
+            if 'category_id' in data:
+                title.category_id = data['category_id']
+                fields.add('category_id')
+        if fields:
+            Title.objects.bulk_update(
+                [data['title'] for data in self.valid.values()],
+                sorted(fields), batch_size=BATCH_SIZE
+            )
+
+    def set_genres(self):
+        with_genres = [
+            data for data in self.valid.values() if 'genre_ids' in data
+        ]
+        through = Title.genre.through
+        if self.partial:
+            through.objects.filter(title_id__in=[
+                data['title'].pk for data in with_genres
+            ]).delete()
+        through.objects.bulk_create([
+            through(title_id=data['title'].pk, genre_id=genre_id)
+            for data in with_genres
+            for genre_id in data['genre_ids']
+        ], batch_size=BATCH_SIZE)
@@ -0,0 +1,225 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .compression import PrecompressedResponse, get_encoding
+from .metrics import registry
+from .routers import replica
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def version_key(prefix):
+    return f'api:{prefix}:version'
+
+
+def now_version():
+    return int(time.time() * 1000)
+
+
+def get_version(prefix):
+    """Текущая версия кэша для группы ответов.
+
+    Версия — момент последнего изменения группы в мс. Если счётчик вытеснен
+    из кэша, он начинается с текущего времени и не совпадёт с прежними.
+    """
+    cache = get_cache()
+    version = cache.get(version_key(prefix))
+    if version is None:
+        version = now_version()
+        if not cache.add(version_key(prefix), version, None):
+            version = cache.get(version_key(prefix), version)
+    return version
+
+
+def version_timeout(prefix):
+    """Версии групп ('titles', 'users') хранятся бессрочно. Версий
+    отдельных объектов ('title:1', 'reviews:1', 'comments:1') столько же,
+    сколько объектов, они живут API_CACHE_TIMEOUT: потерянная версия
+    начинается заново и лишь делает устаревшими записи и валидаторы,
+    которые от неё зависят."""
+    if ':' in prefix:
+        return settings.API_CACHE_TIMEOUT
+    return None
+
+
+def get_versions(prefixes, initial=None):
+    """Версии сразу нескольких групп за одно обращение к кэшу.
+    Отсутствующие версии заводятся со значением initial (по умолчанию —
+    текущее время)."""
+    cache = get_cache()
+    keys = {version_key(prefix): prefix for prefix in prefixes}
+    found = cache.get_many(keys)
+    if initial is None:
+        initial = now_version()
+    missing = {key: initial for key in keys if key not in found}
+    for timeout in {version_timeout(keys[key]) for key in missing}:
+        cache.set_many({
+            key: version for key, version in missing.items()
+            if version_timeout(keys[key]) == timeout
+        }, timeout)
+    found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def replica_may_lag(versions):
+    """True, если запрос читает из реплики, а данные менялись позже,
+    чем REPLICA_STICKY_SECONDS назад: реплика может их ещё не иметь,
+    и такой ответ нельзя кэшировать под текущими версиями."""
+    if replica.get() is None:
+        return False
+    window = settings.REPLICA_STICKY_SECONDS * 1000
+    return now_version() - max(versions) < window
+
+
+def bump_version(prefix):
+    """Инвалидирует все закэшированные ответы группы.
+
+    Новая версия строго больше прежней и не меньше текущего времени, поэтому
+    годится и для Last-Modified. Версия меняется после фиксации транзакции:
+    иначе конкурентный запрос успел бы прочитать старые данные уже под
+    новой версией и закэшировать их.
+    """
+    def bump():
+        cache = get_cache()
+        current = cache.get(version_key(prefix), 0)
+        cache.set(
+            version_key(prefix), max(now_version(), current + 1),
+            version_timeout(prefix),
+        )
+
+    transaction.on_commit(bump)
+
+
+def response_cache_key(prefix, request, version):
+    params = '&'.join(
+        f'{key}={value}'
+        for key, values in sorted(request.query_params.lists())
+        for value in values
+    )
+    digest = hashlib.md5(
+        f'{request.get_host()}?{params}'.encode()
+    ).hexdigest()
+    return f'api:{prefix}:{version}:{digest}'
+
+
+class VersionedCacheListMixin:
+    """Кэширует ответы list-эндпоинта под текущей версией группы.
+
+    Версию поднимает bump_version() при записи в соответствующую модель,
+    поэтому изменения видны уже на следующем запросе. Сжатые
+    CompressionMiddleware байты JSON-ответа хранятся в той же записи
+    и отдаются без рендеринга и повторного сжатия.
+    """
+    cache_prefix = None
+
+    def list(self, request, *args, **kwargs):
+        version = get_version(self.cache_prefix)
+        key = response_cache_key(self.cache_prefix, request, version)
+        cache = get_cache()
+        entry = cache.get(key)
+        if entry is not None and self.is_cache_entry_fresh(entry):
+            registry.inc('api_cache_requests_total',
+                         {'cache': self.cache_prefix, 'result': 'hit'})
+            return self.cached_response(request, key, entry)
+        registry.inc('api_cache_requests_total',
+                     {'cache': self.cache_prefix, 'result': 'miss'})
+        started = now_version()
+        response = super().list(request, *args, **kwargs)
+        entry = self.make_cache_entry(response.data, started)
+        versions = [version, *entry.get('versions', {}).values()]
+        # Версии в записи читаются после выборки. Версия, поднятая
+        # с начала выборки, могла не попасть в данные: такая страница
+        # под ней не кэшируется.
+        changed = any(
+            entry_version >= started
+            for entry_version in entry.get('versions', {}).values()
+        )
+        if not changed and not replica_may_lag(versions):
+            cache.set(key, entry, settings.API_CACHE_TIMEOUT)
+            self.cache_compressed(request, response, key, entry)
+        return response
+
+    def cached_response(self, request, key, entry):
+        encoding = get_encoding(request)
+        compressed = entry.get('compressed', {}).get(encoding)
+        if compressed is not None and self.is_precompressible(request):
+            content, content_type = compressed
+            return PrecompressedResponse(
+                content, encoding, content_type=content_type
+            )
+        response = Response(entry['data'])
+        self.cache_compressed(request, response, key, entry)
+        return response
+
+    @staticmethod
+    def is_precompressible(request):
+        # HTML Browsable API зависит от пользователя, его не храним.
+        renderer = getattr(request, 'accepted_renderer', None)
+        return renderer is not None and renderer.format == 'json'
+
+    def cache_compressed(self, request, response, key, entry):
+        """Сохраняет в записи кэша байты, сжатые CompressionMiddleware."""
+        if not self.is_precompressible(request):
+            return
+
+        def save(encoding, content):
+            entry.setdefault('compressed', {})[encoding] = (
+                content, response['Content-Type']
+            )
+            get_cache().set(key, entry, settings.API_CACHE_TIMEOUT)
+
+        response.cache_compressed = save
+
+    def make_cache_entry(self, data, started):
+        return {'data': data}
+
+    def is_cache_entry_fresh(self, entry):
+        return True
+
+
+def title_version_prefix(title_id):
+    return f'title:{title_id}'
+
+
+class TitleListCacheMixin(VersionedCacheListMixin):
+    """Кэш списка произведений с точечной инвалидацией.
+
+    Общая версия 'titles' меняется, когда может измениться состав выборки
+    (произведения, жанры, категории). Отзыв меняет только рейтинг, поэтому
+    сбрасывает лишь версию своего произведения: страница считается
+    устаревшей, если версия хотя бы одного её произведения изменилась.
+    Список упорядочен по id, так что от рейтинга порядок не зависит.
+    """
+    cache_prefix = 'titles'
+
+    def get_title_prefixes(self, data):
+        # Произведения берутся со страницы пагинатора: в ответе с ?fields=
+        # поля id может не быть.
+        page = getattr(self.paginator, 'page', None)
+        if page is not None:
+            ids = [title.pk for title in page]
+        else:
+            results = data['results'] if isinstance(data, dict) else data
+            ids = [item['id'] for item in results]
+        return [title_version_prefix(title_id) for title_id in ids]
+
+    def make_cache_entry(self, data, started):
+        # Новые версии заводятся чуть раньше начала выборки: иначе
+        # страница с ещё не кэшированными произведениями считалась бы
+        # изменённой во время выборки.
+        return {
+            'data': data,
+            'versions': get_versions(
+                self.get_title_prefixes(data), initial=started - 1
+            ),
+        }
+
+    def is_cache_entry_fresh(self, entry):
+        return get_versions(entry['versions']) == entry['versions']
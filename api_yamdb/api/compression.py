@@ -0,0 +1,176 @@
+"""Сжатие ответов gzip и brotli.
+
+CompressionMiddleware (api.middleware) сжимает ответы, которые
+примет клиент по Accept-Encoding. Кэш списков (api.cache) хранит
+сжатые байты рядом с записью: горячие страницы сжимаются один раз,
+а не на каждом запросе. brotli — необязательная зависимость; без неё
+доступен только gzip.
+"""
+import hashlib
+import mimetypes
+import zlib
+from pathlib import Path
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_safe
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Медиатипы, которые стоит сжимать (по началу строки).
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson', 'application/yaml',
+    'application/javascript', 'application/xml',
+)
+
+
+def gzip_compress(content, level=GZIP_LEVEL):
+    # wbits=31: формат gzip, без отметки времени — одинаковый вход
+    # даёт одинаковые байты.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(content) + compressor.flush()
+
+
+def brotli_compress(content, quality=BROTLI_QUALITY):
+    return brotli.compress(content, quality=quality)
+
+
+# Порядок — предпочтение сервера при равном q у клиента.
+ENCODINGS = {'gzip': gzip_compress}
+if brotli is not None:
+    ENCODINGS = {'br': brotli_compress, **ENCODINGS}
+
+
+def compress(content, encoding):
+    return ENCODINGS[encoding](content)
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает потоковый ответ по частям. После каждой части данные
+    сбрасываются, чтобы клиент получал строки сразу, а не в конце."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def parse_accept_encoding(header):
+    """Кодировки из Accept-Encoding с их q."""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def get_encoding(request):
+    """Лучшая доступная кодировка, которую принимает клиент, или None."""
+    accepted = parse_accept_encoding(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible_type(response):
+    content_type = response.get('Content-Type', '').lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def weaken_etag(response):
+    # Сжатое представление отличается от исходного побайтно, поэтому
+    # сильный ETag становится слабым (как в GZipMiddleware Django).
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = f'W/{etag}'
+
+
+class PrecompressedResponse(HttpResponse):
+    """Ответ с уже сжатым содержимым, например из кэша.
+    CompressionMiddleware его не сжимает, а лишь ослабляет ETag."""
+
+    def __init__(self, content, encoding, *args, **kwargs):
+        super().__init__(content, *args, **kwargs)
+        self.encoding = encoding
+        self['Content-Encoding'] = encoding
+        patch_vary_headers(self, ('Accept-Encoding',))
+
+
+class PrecompressedFileView:
+    """Отдаёт статический файл (например, static/redoc.yaml), сжатый
+    заранее: каждая кодировка считается один раз с максимальным
+    сжатием, пока файл не изменится."""
+
+    levels = {'br': 11, 'gzip': 9}
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.content_type = (
+            mimetypes.guess_type(self.path.name)[0] or 'text/plain'
+        )
+        if self.path.suffix in ('.yaml', '.yml'):
+            self.content_type = 'application/yaml'
+        # (mtime, etag, variants) меняются вместе: параллельный запрос
+        # не увидит ETag нового файла со старыми байтами.
+        self.loaded = (None, None, {})
+
+    def load(self):
+        """ETag и варианты содержимого по кодировкам."""
+        loaded = self.loaded
+        mtime = self.path.stat().st_mtime
+        if mtime != loaded[0]:
+            content = self.path.read_bytes()
+            variants = {None: content}
+            for encoding, compressor in ENCODINGS.items():
+                variants[encoding] = compressor(
+                    content, self.levels[encoding]
+                )
+            etag = f'"{hashlib.md5(content).hexdigest()}"'
+            loaded = self.loaded = (mtime, etag, variants)
+        return loaded[1:]
+
+    @method_decorator(require_safe)
+    def __call__(self, request):
+        etag, variants = self.load()
+        encoding = get_encoding(request)
+        if encoding is not None:
+            etag = f'W/{etag}'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            if encoding is None:
+                response = HttpResponse(
+                    variants[None], content_type=self.content_type
+                )
+            else:
+                response = PrecompressedResponse(
+                    variants[encoding], encoding,
+                    content_type=self.content_type,
+                )
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
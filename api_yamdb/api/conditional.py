@@ -0,0 +1,69 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import get_versions, now_version, replica_may_lag
+from .metrics import registry
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы для list и retrieve.
+
+    ETag и Last-Modified строятся по версиям из кэша (get_versions), без
+    обращения к БД, поэтому ответ 304 отдаётся до выполнения queryset.
+    Версии, от которых зависит ответ, возвращает get_etag_prefixes().
+
+    Версии хранятся в миллисекундах, а Last-Modified — в секундах:
+    изменение в ту же секунду не поменяло бы дату. Поэтому дата
+    округляется вверх, а If-Modified-Since учитывается, только когда
+    эта секунда уже прошла.
+    """
+
+    def get_etag_prefixes(self):
+        raise NotImplementedError
+
+    def get_validators(self, request, versions):
+        # Ответ зависит и от адреса с параметрами, и от формата.
+        payload = '|'.join([
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            *(
+                f'{prefix}={version}'
+                for prefix, version in sorted(versions.items())
+            ),
+        ])
+        etag = f'"{hashlib.md5(payload.encode()).hexdigest()}"'
+        return etag, -(-max(versions.values()) // 1000)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.get_etag_prefixes())
+        etag, last_modified = self.get_validators(request, versions)
+        settled = last_modified * 1000 <= now_version()
+        response = get_conditional_response(
+            request, etag=etag,
+            last_modified=last_modified if settled else None,
+        )
+        registry.inc('api_cache_requests_total', {
+            'cache': 'etag',
+            'result': 'miss' if response is None else 'hit',
+        })
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        # Ответ из отстающей реплики не должен получить валидаторы
+        # свежих версий, иначе клиент закэширует устаревшие данные.
+        if (
+            response.status_code in (200, 304)
+            and not replica_may_lag(versions.values())
+        ):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(
+                last_modified if settled else last_modified - 1
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
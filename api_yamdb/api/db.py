@@ -0,0 +1,12 @@
+"""Настройка соединений с БД."""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS на каждом новом соединении с SQLite
+    (сигнал connection_created, подключается в ApiConfig.ready)."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
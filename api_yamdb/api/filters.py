@@ -1,7 +1,22 @@
+import re
+
 import django_filters
+from django.db import connection
 
 from reviews.models import Title
 
+SEARCH_WORD_PATTERN = re.compile(r'\w+')
+# Веса bm25 для колонок name и description: совпадение в названии важнее.
+SEARCH_RANK = 'bm25(reviews_title_fts, 10.0, 1.0)'
+
+
+def make_fts_query(value):
+    """Превращает ввод пользователя в безопасный запрос FTS5:
+    каждое слово ищется по префиксу, все слова обязательны."""
+    return ' '.join(
+        f'"{word}"*' for word in SEARCH_WORD_PATTERN.findall(value)
+    )
+
 
 class TitleFilter(django_filters.FilterSet):
     genre = django_filters.CharFilter(field_name='genre', lookup_expr='slug')
@@ -10,7 +25,27 @@ class TitleFilter(django_filters.FilterSet):
     year = django_filters.NumberFilter(field_name='year')
     name = django_filters.CharFilter(field_name='name',
                                      lookup_expr='icontains')
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('genre', 'category', 'year', 'name')
+        fields = ('genre', 'category', 'year', 'name', 'search')
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию через FTS5,
+        результаты упорядочены по релевантности (bm25)."""
+        query = make_fts_query(value)
+        if not query:
+            return queryset
+        if connection.vendor != 'sqlite':
+            return queryset.filter(name__icontains=value)
+        return queryset.extra(
+            tables=['reviews_title_fts'],
+            where=[
+                'reviews_title_fts.rowid = reviews_title.id',
+                'reviews_title_fts MATCH %s',
+            ],
+            params=[query],
+            select={'search_rank': SEARCH_RANK},
+            order_by=['search_rank', 'id'],
+        )
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = "Copies the default SQLite database into the read replica files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Replica files; defaults to DATABASE_REPLICAS',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Repeat every N seconds instead of copying once',
+        )
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('Replica refresh supports SQLite only')
+        paths = options['paths'] or [
+            settings.DATABASES[alias]['NAME']
+            for alias in settings.DATABASE_REPLICAS
+        ]
+        if not paths:
+            raise CommandError('No replicas configured (DB_REPLICAS)')
+        while True:
+            for path in paths:
+                self.refresh(primary, path)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def refresh(self, primary, path):
+        """Онлайн-копия через backup API SQLite: default не блокируется
+        на время копирования, реплика получает согласованный снимок."""
+        started = time.perf_counter()
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(
+            f'{path}: refreshed in {time.perf_counter() - started:.2f} s'
+        )
@@ -0,0 +1,293 @@
+"""Метрики в формате Prometheus для нескольких процессов.
+
+Каждый процесс пишет свои значения в отдельный файл METRICS_DIR/<pid>.db,
+отображённый в память (mmap): запись — это обновление 8 байт в своей
+памяти под локом процесса, без межпроцессных блокировок. Эндпоинт /metrics
+читает файлы всех процессов и суммирует значения.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from contextlib import ExitStack
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.urls import URLPattern
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+    float('inf'),
+)
+METRICS_HELP = {
+    'api_requests_total': ('counter', 'Requests by route, action and status'),
+    'api_request_duration_seconds': (
+        'histogram', 'Request latency by route and action'
+    ),
+    'api_db_queries_total': ('counter', 'SQL queries by route and action'),
+    'api_cache_requests_total': (
+        'counter', 'Response cache lookups by cache and result'
+    ),
+}
+HEADER_SIZE = 8
+INITIAL_SIZE = 1 << 16
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def padding(key_length):
+    """Выравнивает значение после ключа по 8 байтам."""
+    return (8 - (key_length + 4) % 8) % 8
+
+
+def read_entries(data):
+    """Пары (ключ, значение) из содержимого файла метрик."""
+    used = struct.unpack_from('i', data, 0)[0]
+    position = HEADER_SIZE
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        key_start = position + 4
+        value_position = key_start + length + padding(length)
+        key = bytes(data[key_start:key_start + length]).decode()
+        yield key, struct.unpack_from('d', data, value_position)[0], (
+            value_position
+        )
+        position = value_position + 8
+
+
+class MmapedDict:
+    """Словарь ключ -> float в файле, отображённом в память.
+
+    Формат: 4 байта занятого объёма и 4 байта выравнивания, затем записи
+    [4 байта длины ключа][ключ, дополненный до 8 байт][8 байт double].
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self._capacity = size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._positions = {}
+        self._used = struct.unpack_from('i', self._map, 0)[0]
+        if self._used == 0:
+            self._used = HEADER_SIZE
+            struct.pack_into('i', self._map, 0, self._used)
+        else:
+            for key, _, position in read_entries(self._map):
+                self._positions[key] = position
+
+    def _add_key(self, key):
+        encoded = key.encode()
+        entry = struct.pack(
+            f'i{len(encoded) + padding(len(encoded))}sd',
+            len(encoded), encoded, 0.0,
+        )
+        if self._used + len(entry) > self._capacity:
+            while self._used + len(entry) > self._capacity:
+                self._capacity *= 2
+            self._file.truncate(self._capacity)
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._map[self._used:self._used + len(entry)] = entry
+        self._used += len(entry)
+        # Объём обновляется последним: читатель не увидит недописанную запись.
+        struct.pack_into('i', self._map, 0, self._used)
+        self._positions[key] = self._used - 8
+        return self._positions[key]
+
+    def increment(self, key, amount):
+        position = self._positions.get(key)
+        if position is None:
+            position = self._add_key(key)
+        value = struct.unpack_from('d', self._map, position)[0]
+        struct.pack_into('d', self._map, position, value + amount)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._values = None
+
+    @property
+    def directory(self):
+        return Path(settings.METRICS_DIR)
+
+    def _store(self):
+        # После fork у процесса должен быть собственный файл.
+        if self._values is None or self._pid != os.getpid():
+            if self._values is not None:
+                # Отображение, унаследованное от родителя.
+                self._values.close()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._pid = os.getpid()
+            self._values = MmapedDict(self.directory / f'{self._pid}.db')
+        return self._values
+
+    def inc(self, name, labels, amount=1.0):
+        key = json.dumps([name, sorted(labels.items())], ensure_ascii=False)
+        with self._lock:
+            self._store().increment(key, amount)
+
+    def reset(self):
+        """Закрывает файл процесса. Следующая запись откроет файл
+        в текущем METRICS_DIR: так тесты перенаправляют метрики во
+        временный каталог."""
+        with self._lock:
+            if self._values is not None:
+                self._values.close()
+            self._pid = None
+            self._values = None
+
+    def observe(self, name, labels, value):
+        for bucket in LATENCY_BUCKETS:
+            if value <= bucket:
+                break
+        self.inc(f'{name}_bucket', {**labels, 'le': str(bucket)})
+        self.inc(f'{name}_sum', labels, value)
+        self.inc(f'{name}_count', labels)
+
+    def collect(self):
+        """Суммы значений по всем процессам."""
+        totals = defaultdict(float)
+        for path in self.directory.glob('*.db'):
+            with open(path, 'rb') as metrics_file:
+                data = metrics_file.read()
+            if len(data) < HEADER_SIZE:
+                continue
+            for key, value, _ in read_entries(data):
+                totals[key] += value
+        return totals
+
+
+registry = MetricsRegistry()
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        f'{name}="{json.dumps(str(value), ensure_ascii=False)[1:-1]}"'
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def render_metrics():
+    """Текст метрик в формате Prometheus; бакеты гистограмм
+    хранятся раздельно и здесь складываются в накопительные."""
+    samples = defaultdict(list)
+    buckets = defaultdict(dict)
+    for key, value in registry.collect().items():
+        name, labels = json.loads(key)
+        labels = [tuple(pair) for pair in labels]
+        if name.endswith('_bucket'):
+            le = dict(labels)['le']
+            series = tuple(pair for pair in labels if pair[0] != 'le')
+            buckets[(name, series)][float(le)] = value
+        else:
+            samples[name].append((labels, value))
+
+    for (name, series), counts in buckets.items():
+        cumulative = 0.0
+        for bucket in LATENCY_BUCKETS:
+            cumulative += counts.get(bucket, 0.0)
+            le = '+Inf' if bucket == float('inf') else repr(bucket)
+            samples[name].append(([*series, ('le', le)], cumulative))
+
+    lines = []
+    for family, (metric_type, help_text) in METRICS_HELP.items():
+        names = [
+            name for name in sorted(samples)
+            if name == family or name.rsplit('_', 1)[0] == family
+        ]
+        if not names:
+            continue
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {metric_type}')
+        for name in names:
+            for labels, value in samples[name]:
+                lines.append(f'{name}{format_labels(labels)} {float(value)!r}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+def instrument_view(view, basename):
+    """Оборачивает view вьюсета: число запросов, гистограмма задержек,
+    статусы и число SQL-запросов по маршруту (basename) и action."""
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        action = view.actions.get(request.method.lower(), 'other')
+        counter = QueryCounter()
+        started = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = view(request, *args, **kwargs)
+        labels = {'route': basename, 'action': action}
+
+        def record(response):
+            registry.observe(
+                'api_request_duration_seconds', labels,
+                perf_counter() - started
+            )
+            registry.inc('api_db_queries_total', labels, counter.queries)
+            registry.inc('api_requests_total', {
+                **labels,
+                'method': request.method,
+                'status': str(response.status_code),
+            })
+
+        # Рендеринг ответа тоже входит в задержку маршрута, поэтому
+        # ответ DRF учитывается после него.
+        if getattr(response, 'is_rendered', True):
+            record(response)
+        else:
+            response.add_post_render_callback(record)
+        return response
+
+    return wrapped
+
+
+def instrument_router_urls(router):
+    """URL роутера с инструментированными view вьюсетов."""
+    patterns = []
+    for pattern in router.urls:
+        view = pattern.callback
+        basename = getattr(view, 'initkwargs', {}).get('basename')
+        if basename is None or not hasattr(view, 'actions'):
+            # Корневой APIRootView роутера не относится к вьюсетам.
+            patterns.append(pattern)
+            continue
+        patterns.append(URLPattern(
+            pattern.pattern,
+            instrument_view(view, basename),
+            pattern.default_args,
+            pattern.name,
+        ))
+    return patterns
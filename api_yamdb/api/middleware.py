@@ -0,0 +1,364 @@
+import hashlib
+import json
+import logging
+import random
+import traceback
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections, transaction
+from django.utils.cache import patch_vary_headers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.viewsets import ViewSetMixin
+
+from .compression import (PrecompressedResponse, compress, compress_stream,
+                          get_encoding, is_compressible_type, weaken_etag)
+from .routers import replica
+
+logger = logging.getLogger('api.timing')
+slow_query_logger = logging.getLogger('api.slow_queries')
+
+# Сколько кадров кода проекта сохранять в записи о медленном запросе.
+SLOW_QUERY_STACK_DEPTH = 5
+
+
+def is_read_query(sql):
+    return sql.lstrip().split(None, 1)[0].upper() in ('SELECT', 'WITH')
+
+
+class RequestTiming:
+    """Замеры одного запроса: SQL, работа view, сериализация объектов,
+    рендеринг ответа."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.view_started = None
+        self.view_finished = None
+        self.finished = None
+
+    def execute(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries += 1
+
+    def serializing(self, to_representation):
+        """Оборачивает to_representation сериализатора ответа."""
+        def timed(instance):
+            started = perf_counter()
+            try:
+                return to_representation(instance)
+            finally:
+                self.serialize_time += perf_counter() - started
+
+        return timed
+
+    def durations(self):
+        """Длительности в миллисекундах. Сериализация объектов
+        (serializer.data) идёт внутри view и вычитается из него,
+        рендеринг в байты идёт после view."""
+        total = self.finished - self.started
+        view = render = 0.0
+        if self.view_started is not None:
+            view_end = self.view_finished or self.finished
+            view = view_end - self.view_started - self.serialize_time
+            if self.view_finished is not None:
+                render = self.finished - self.view_finished
+        return {
+            'db': self.db_time * 1000,
+            'view': view * 1000,
+            'serialize': self.serialize_time * 1000,
+            'render': render * 1000,
+            'total': total * 1000,
+        }
+
+
+class SerializationTimingMixin:
+    """Отдаёт RequestTimingMiddleware время сериализации объектов
+    ответа отдельно от остальной работы view."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        timing = getattr(self.request, 'timing', None)
+        if timing is not None:
+            serializer.to_representation = timing.serializing(
+                serializer.to_representation
+            )
+        return serializer
+
+
+class RequestTimingMiddleware:
+    """Считает SQL-запросы и время обработки запроса.
+
+    Отдаёт замеры заголовком Server-Timing и строкой JSON в логгер
+    api.timing. Замеряется доля запросов REQUEST_TIMING_SAMPLE_RATE,
+    остальные проходят без накладных расходов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return self.get_response(request)
+        timing = request.timing = RequestTiming()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing.execute))
+            response = self.get_response(request)
+        timing.finished = perf_counter()
+        durations = timing.durations()
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={durations["db"]:.2f};desc="{timing.queries} queries"',
+            f'view;dur={durations["view"]:.2f}',
+            f'serialize;dur={durations["serialize"]:.2f}',
+            f'render;dur={durations["render"]:.2f}',
+            f'total;dur={durations["total"]:.2f}',
+        ))
+        if logger.isEnabledFor(logging.INFO):
+            self.log(request, response, timing, durations)
+        return response
+
+    @staticmethod
+    def log(request, response, timing, durations):
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{f'{name}_ms': round(value, 2)
+               for name, value in durations.items()},
+        }))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.view_started = perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.view_finished = perf_counter()
+        return response
+
+
+class SlowQueryLog:
+    """Пишет в лог api.slow_queries SQL-запросы дольше порога:
+    view и action, место в коде проекта, откуда пришёл запрос,
+    и план запроса."""
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold
+        self.explaining = False
+
+    def wrapper(self, connection):
+        def execute_wrapper(execute, sql, params, many, context):
+            started = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duration = perf_counter() - started
+                # Запросы самого EXPLAIN (и его точки сохранения)
+                # в лог не попадают.
+                if duration >= self.threshold and not self.explaining:
+                    self.log(connection, sql, params, many, duration)
+        return execute_wrapper
+
+    def log(self, connection, sql, params, many, duration):
+        match = self.request.resolver_match
+        actions = getattr(match.func, 'actions', {}) if match else {}
+        stack = self.call_stack()
+        # Параметры записи — это хэши паролей, email и коды
+        # подтверждения: в лог попадают только параметры чтения.
+        read = is_read_query(sql) and not many
+        slow_query_logger.warning(json.dumps({
+            'duration_ms': round(duration * 1000, 2),
+            'method': self.request.method,
+            'path': self.request.path,
+            'view': match.view_name if match else None,
+            'action': actions.get(self.request.method.lower()),
+            'call_site': stack[0] if stack else None,
+            'stack': stack,
+            'sql': sql,
+            'params': [str(param) for param in params or ()] if read
+            else None,
+            'plan': self.explain(connection, sql, params) if read else None,
+        }, ensure_ascii=False))
+
+    @staticmethod
+    def call_stack():
+        """Кадры кода проекта от ближайшего к запросу: ORM и библиотеки
+        пропускаются, остаётся строка, которая неявно выполнила SQL."""
+        base_dir = str(settings.BASE_DIR)
+        frames = [
+            frame for frame in reversed(traceback.extract_stack())
+            if frame.filename.startswith(base_dir)
+            and 'site-packages' not in frame.filename
+            and frame.filename != __file__
+        ]
+        return [
+            f'{frame.filename[len(base_dir) + 1:]}:{frame.lineno} '
+            f'in {frame.name}'
+            for frame in frames[:SLOW_QUERY_STACK_DEPTH]
+        ]
+
+    def explain(self, connection, sql, params):
+        """План запроса на чтение."""
+        prefix = connection.ops.explain_query_prefix()
+        if connection.vendor == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN'
+        self.explaining = True
+        try:
+            with ExitStack() as stack:
+                if connection.in_atomic_block:
+                    # Точка сохранения: ошибка EXPLAIN не должна
+                    # сломать транзакцию запроса.
+                    stack.enter_context(
+                        transaction.atomic(using=connection.alias)
+                    )
+                cursor = stack.enter_context(connection.cursor())
+                cursor.execute(f'{prefix} {sql}', params)
+                return [
+                    # В SQLite описание шага плана — последняя колонка.
+                    str(row[-1]) if connection.vendor == 'sqlite'
+                    else ' '.join(str(column) for column in row)
+                    for row in cursor.fetchall()
+                ]
+        except DatabaseError as error:
+            return [f'EXPLAIN failed: {error}']
+        finally:
+            self.explaining = False
+
+
+class SlowQueryLogMiddleware:
+    """Включает SlowQueryLog на время запроса. Порог задаётся
+    SLOW_QUERY_THRESHOLD_MS; отрицательное значение выключает лог."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        if self.threshold < 0:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        slow_queries = SlowQueryLog(request, self.threshold)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                wrapper = slow_queries.wrapper(connection)
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет чтения безопасных запросов к вьюсетам api на случайную
+    реплику из DATABASE_REPLICAS. Клиент (по заголовку Authorization
+    или IP) после небезопасного запроса REPLICA_STICKY_SECONDS читает
+    из default."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = settings.DATABASE_REPLICAS
+        if not self.replicas:
+            raise MiddlewareNotUsed
+
+    @staticmethod
+    def sticky_key(request):
+        client = (
+            request.META.get('HTTP_AUTHORIZATION')
+            or request.META.get('REMOTE_ADDR', '')
+        )
+        return f'api:sticky:{hashlib.md5(client.encode()).hexdigest()}'
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, 'replica_token', None)
+            if token is not None:
+                replica.reset(token)
+        if request.method not in SAFE_METHODS:
+            caches[settings.API_CACHE_ALIAS].set(
+                self.sticky_key(request), True,
+                settings.REPLICA_STICKY_SECONDS,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if (
+            request.method in SAFE_METHODS
+            and view_class is not None
+            and issubclass(view_class, ViewSetMixin)
+            and view_class.__module__.startswith('api.')
+            and not caches[settings.API_CACHE_ALIAS].get(
+                self.sticky_key(request)
+            )
+        ):
+            request.replica_token = replica.set(
+                random.choice(self.replicas)
+            )
+
+
+class CompressionMiddleware:
+    """Сжимает ответы gzip или brotli по Accept-Encoding клиента.
+    Обычные ответы сжимаются от COMPRESSION_MIN_SIZE байт, потоковые —
+    всегда. Если ответ пришёл из кэша списков, сжатые байты
+    сохраняются рядом с ним (response.cache_compressed)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        if self.min_size < 0:
+            raise MiddlewareNotUsed
+
+    def is_compressible(self, response):
+        return (
+            not response.has_header('Content-Encoding')
+            and is_compressible_type(response)
+            and (
+                response.streaming
+                or len(response.content) >= self.min_size
+            )
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if isinstance(response, PrecompressedResponse):
+            # DRF заменяет Vary своим значением, возвращаем кодировку.
+            patch_vary_headers(response, ('Accept-Encoding',))
+            weaken_etag(response)
+            return response
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = get_encoding(request)
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            content = compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            save = getattr(response, 'cache_compressed', None)
+            if save is not None:
+                save(encoding, content)
+        response['Content-Encoding'] = encoding
+        weaken_etag(response)
+        return response
@@ -1,5 +1,12 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
@@ -15,3 +22,84 @@ class CustomPageNumberPagination(PageNumberPagination):
             'previous': self.get_previous_link(),
             'results': data
         })
+
+
+class PubDateKeysetPagination(PageNumberPagination):
+    """Постраничная пагинация с опциональным режимом курсора.
+
+    По умолчанию работает как PageNumberPagination. При ``?pagination=cursor``
+    или переданном ``cursor`` выдаёт страницы по ключу ``(pub_date, id)``
+    без COUNT(*) и OFFSET.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_query_param = 'cursor'
+    ordering = ('-pub_date', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or bool(request.query_params.get(self.cursor_query_param))
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode_enabled = self.is_cursor_mode(request)
+        if not self.cursor_mode_enabled:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            )
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page_results = results[:page_size]
+        return self.page_results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode_enabled:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_cursor_link(),
+            'results': data
+        })
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        last = self.page_results[-1]
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(last)
+        )
+
+    @staticmethod
+    def encode_cursor(obj):
+        position = f'{obj.pub_date.isoformat()}|{obj.pk}'
+        return urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw_pub_date, raw_pk = (
+                urlsafe_b64decode(encoded.encode()).decode().split('|')
+            )
+            pub_date = parse_datetime(raw_pub_date)
+            pk = int(raw_pk)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
@@ -17,7 +17,7 @@ class AuthorModeratorAdminOrReadOnly(BasePermission):
         user = request.user
         return (
             request.method in SAFE_METHODS
-            or obj.author == user
+            or obj.author_id == user.id
             or user.is_admin
             or user.is_moderator
         )
@@ -56,8 +56,8 @@ class IsAuthorAdminModerOrReadOnly(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or user.is_admin
             or user.is_moderator
-            or obj.author == user
+            or obj.author_id == user.id
             or (request.method == 'PATCH' and (
-                obj.author == user or user.is_moderator))
-            or (request.method == 'DELETE' and obj.author == user)
+                obj.author_id == user.id or user.is_moderator))
+            or (request.method == 'DELETE' and obj.author_id == user.id)
         )
@@ -0,0 +1,71 @@
+"""Быстрый JSON-рендерер на orjson.
+
+orjson пишет сразу в bytes, без промежуточной строки. Вывод совпадает
+с JSONRenderer DRF байт в байт: компактные разделители, UTF-8 без
+экранирования, даты и прочие типы — через тот же encoder_class.
+Единственное отличие — порядок у float: orjson пишет 1e16 и 1.5e-7,
+json — 1e+16 и 1.5e-07 (значения те же; сериализаторы API float
+не отдают). Если orjson не установлен, нужен отступ или другие
+настройки JSON, работает обычный JSONRenderer.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        # Даты и dataclass кодируются как в DRF, а не форматом orjson.
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит: их умеет только json.
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как и JSONRenderer, экранируем U+2028 и U+2029. Поиск одного
+        # байта (memchr) намного быстрее поиска подстроки.
+        if b'\xe2' in ret:
+            ret = ret.replace(
+                b'\xe2\x80\xa8', b'\\u2028'
+            ).replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class NDJSONRenderer(BaseRenderer):
+    """JSON Lines: каждый объект — отдельная строка JSON. Выгрузки
+    (api.export) пишут строки этим рендерером сами, через DRF проходят
+    только ответы с ошибками."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return FastJSONRenderer().render(data) + b'\n'
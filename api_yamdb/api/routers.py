@@ -0,0 +1,28 @@
+"""Маршрутизация чтений на реплики БД.
+
+ReplicaRoutingMiddleware выбирает реплику для безопасных запросов
+к вьюсетам api и запоминает её в контекстной переменной на время
+запроса; ReplicaRouter отправляет туда чтения, а записи — всегда
+в default. После записи клиент REPLICA_STICKY_SECONDS читает из
+default, чтобы видеть свои изменения, пока они доходят до реплик.
+"""
+from contextvars import ContextVar
+
+replica = ContextVar('api_db_replica', default=None)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return replica.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default, объекты из них связываются свободно.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик копируется вместе с данными (refresh_replicas).
+        return db == 'default'
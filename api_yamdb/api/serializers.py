@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 from django.core.validators import (RegexValidator,
                                     MaxValueValidator,
                                     MinValueValidator)
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
 from reviews.models import (Category,
@@ -14,6 +16,35 @@ from reviews.models import (Category,
                             User)
 
 
+def get_requested_fields(request):
+    """Поля из параметра ?fields=id,name или None, если он не задан.
+    Учитывается только при чтении."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля из параметра ?fields=.
+    Вложенные сериализаторы не затрагиваются."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get('request'))
+        if requested is None:
+            return
+        unknown = requested - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            })
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+
+
 class UserEditSerializer(serializers.ModelSerializer):
     username = serializers.RegexField(
         max_length=150, regex=r'^[\w.@+-]+\Z', required=True
@@ -54,7 +85,7 @@ class RegistrationSerializer(serializers.Serializer):
         return value
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         exclude = ('id', )
@@ -62,7 +93,7 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=150,
         required=True,
@@ -86,7 +117,7 @@ class UserSerializer(serializers.ModelSerializer):
         )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = ('name', 'slug')
         model = Genre
@@ -100,8 +131,7 @@ class GenreSerializer(serializers.ModelSerializer):
             )
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    rating = serializers.IntegerField(read_only=True)
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(
         required=True,
@@ -117,19 +147,22 @@ class TitleSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+TITLE_YEAR_VALIDATORS = [
+    MinValueValidator(
+        0,
+        'Нельзя добавлять произведения с годом меньше 0.'
+    ),
+    MaxValueValidator(
+        timezone.now().year,
+        'Нельзя добавлять произведения, которые еще не вышли.'
+    ),
+]
+
+
 class TitleSerializerWrite(serializers.ModelSerializer):
     year = serializers.IntegerField(
         required=True,
-        validators=[
-            MinValueValidator(
-                0,
-                'Нельзя добавлять произведения с годом меньше 0.'
-            ),
-            MaxValueValidator(
-                timezone.now().year,
-                'Нельзя добавлять произведения, которые еще не вышли.'
-            ),
-        ],
+        validators=TITLE_YEAR_VALIDATORS,
     )
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
@@ -147,26 +180,54 @@ class TitleSerializerWrite(serializers.ModelSerializer):
             'id', 'name', 'year', 'description', 'genre', 'category')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
-    author = serializers.SlugRelatedField(
-        slug_field='username', read_only=True,
-        default=serializers.CurrentUserDefault()
+class TitleBulkSerializer(serializers.Serializer):
+    """Одно произведение в пакетной загрузке. Жанры и категория
+    задаются слагами и разрешаются сразу для всего пакета."""
+
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=256)
+    year = serializers.IntegerField(validators=TITLE_YEAR_VALIDATORS)
+    description = serializers.CharField(required=False, allow_blank=True)
+    genre = serializers.ListField(
+        child=serializers.SlugField(), allow_empty=False
     )
+    category = serializers.SlugField()
 
     def validate(self, data):
-        if self.context['request'].method != 'POST':
-            return data
-        if Review.objects.filter(
-            author=self.context['request'].user,
-            title=get_object_or_404(
-                Title,
-                id=self.context['view'].kwargs.get('title_id'))
-        ).exists():
+        if self.partial and 'id' not in data:
             raise serializers.ValidationError(
-                'Вы не можете добавить более'
-                'одного отзыва на произведение')
+                {'id': 'Обязательное поле.'}
+            )
         return data
 
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.SlugRelatedField(
+        slug_field='username', read_only=True,
+        default=serializers.CurrentUserDefault()
+    )
+
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_title_author,
+        # отдельный запрос на проверку нужен только после ошибки.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author'],
+            ).exists():
+                # Другое нарушение целостности (внешний ключ, NOT NULL).
+                raise
+            # Та же форма ошибки, что у проверки в validate().
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы не можете добавить более '
+                    'одного отзыва на произведение'
+                ]
+            })
+
     class Meta:
         model = Review
         fields = ('id',
@@ -178,7 +239,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('title',)
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор модели Comment"""
 
     author = serializers.SlugRelatedField(
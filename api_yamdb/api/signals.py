@@ -0,0 +1,85 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.signals import title_rating_changed
+from .authentication import DELETED, set_token_version
+from .cache import bump_version, title_version_prefix
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    bump_version('categories')
+    bump_version('titles')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    bump_version('genres')
+    bump_version('titles')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_changed(sender, **kwargs):
+    bump_version('titles')
+
+
+@receiver(title_rating_changed)
+def rating_changed(sender, title_id, **kwargs):
+    bump_version('ratings')
+    if title_id is None:
+        bump_version('titles')
+    else:
+        bump_version(title_version_prefix(title_id))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    bump_version(f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_version(f'comments:{instance.review_id}')
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    # Отзывы и комментарии показывают username автора, остальные поля
+    # на них не влияют. У нового пользователя текстов ещё нет, а при
+    # удалении его отзывы и комментарии удаляются каскадом со своими
+    # сигналами.
+    loaded = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if not created and loaded != instance.username:
+        bump_version('users')
+
+
+@receiver(pre_save, sender=User)
+def user_claims_changing(sender, instance, **kwargs):
+    # Роль и статус записаны в выданные токены: при их изменении
+    # новая версия делает старые токены недействительными.
+    if instance.token_claims_changed():
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    instance._loaded_token_claims = instance.token_claims()
+    set_token_version(instance.pk, instance.token_version)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    set_token_version(instance.pk, DELETED)
@@ -1,5 +1,7 @@
 from django.urls import include, path
 from rest_framework import routers
+from .export import CommentExportView, ReviewExportView, TitleExportView
+from .metrics import instrument_router_urls
 from .views import sign_up
 from .views import (
     TokenApiView,
@@ -38,7 +40,18 @@ v1_router.register(
 )
 
 urlpatterns = [
-    path('v1/', include(v1_router.urls)),
+    path('v1/', include(instrument_router_urls(v1_router))),
     path('v1/auth/token/', TokenApiView.as_view(), name='token_obtain_pair'),
     path('v1/auth/signup/', sign_up, name='signup'),
+    path(
+        'v1/export/titles/', TitleExportView.as_view(), name='export_titles'
+    ),
+    path(
+        'v1/export/reviews/', ReviewExportView.as_view(),
+        name='export_reviews'
+    ),
+    path(
+        'v1/export/comments/', CommentExportView.as_view(),
+        name='export_comments'
+    ),
 ]
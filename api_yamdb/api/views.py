@@ -4,10 +4,8 @@ from rest_framework.views import APIView
 from rest_framework.decorators import action, api_view
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Avg
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 
@@ -22,20 +20,74 @@ from .serializers import (
     TitleSerializer,
     TitleSerializerWrite,
     ReviewSerializer,
-    CommentSerializer,)
+    CommentSerializer,
+    get_requested_fields,)
+from users.outbox import enqueue_email
 from reviews.models import (Category,
                             User,
                             Genre,
                             Title,
                             Review,)
+from .authentication import get_access_token, get_db_user
+from .bulk import TitleBulkWriter
 from .permissions import (IsAuthorAdminModerOrReadOnly,
                           AdminPermission,
                           AdminReadOnly,)
 from .filters import TitleFilter
+from .pagination import PubDateKeysetPagination
+from .cache import (TitleListCacheMixin,
+                    VersionedCacheListMixin,
+                    title_version_prefix,)
+from .conditional import ConditionalGetMixin
+from .middleware import SerializationTimingMixin
+
+
+class SparseFieldsetMixin:
+    """Сокращает queryset под поля из ?fields= (SparseFieldsMixin
+    сериализатора): загружаются только нужные колонки, а JOIN
+    и prefetch делаются только для запрошенных связей."""
+
+    # Поле сериализатора -> пути для only(); по умолчанию — имя поля.
+    sparse_columns = {}
+    # Колонки, нужные всегда: ключ, порядок, курсор пагинации.
+    sparse_required_columns = ('id',)
+    # Поле сериализатора -> связь для select_related/prefetch_related.
+    sparse_select_related = {}
+    sparse_prefetch_related = {}
 
-
-class GetPostDeleteViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
-                           mixins.ListModelMixin, viewsets.GenericViewSet):
+    def get_queryset(self):
+        return self.prune_queryset(super().get_queryset())
+
+    def prune_queryset(self, queryset):
+        if (
+            self.action not in ('list', 'retrieve')
+            or get_requested_fields(self.request) is None
+        ):
+            return queryset
+        # Сериализатор проверяет ?fields= и оставляет нужные поля.
+        fields = self.get_serializer().fields
+        queryset = queryset.select_related(None).prefetch_related(None)
+        related = [
+            self.sparse_select_related[name] for name in fields
+            if name in self.sparse_select_related
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        prefetch = [
+            self.sparse_prefetch_related[name] for name in fields
+            if name in self.sparse_prefetch_related
+        ]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset.only(*self.sparse_required_columns, *{
+            column for name in fields
+            for column in self.sparse_columns.get(name, (name,))
+        })
+
+
+class GetPostDeleteViewSet(SerializationTimingMixin, mixins.CreateModelMixin,
+                           mixins.DestroyModelMixin, mixins.ListModelMixin,
+                           viewsets.GenericViewSet):
     pass
 
 
@@ -62,16 +114,17 @@ def sign_up(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
     else:
-        user = User.objects.create_user(**serializer.validated_data)
-        confirmation_code = default_token_generator.make_token(user)
-
-        send_mail(
-            'Token Token Token',
-            confirmation_code,
-            'Yamdb',
-            [email],
-            fail_silently=False,
-        )
+        # Письмо ставится в очередь вместе с созданием пользователя,
+        # отправляет его команда send_emails.
+        with transaction.atomic():
+            user = User.objects.create_user(**serializer.validated_data)
+            confirmation_code = default_token_generator.make_token(user)
+            enqueue_email(
+                'Token Token Token',
+                confirmation_code,
+                'Yamdb',
+                email,
+            )
 
     user.save()
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -99,15 +152,16 @@ class TokenApiView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                     data={'confirmation_code': 'Incorrect code'}
                 )
-            token = RefreshToken.for_user(user)
             return Response(
-                {'token': str(token.access_token)},
+                {'token': str(get_access_token(user))},
                 status=status.HTTP_200_OK,
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CategoryViewSet(GetPostDeleteViewSet):
+class CategoryViewSet(SparseFieldsetMixin, VersionedCacheListMixin,
+                      GetPostDeleteViewSet):
+    cache_prefix = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (AdminReadOnly,)
@@ -116,7 +170,8 @@ class CategoryViewSet(GetPostDeleteViewSet):
     lookup_field = 'slug'
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(SerializationTimingMixin, SparseFieldsetMixin,
+                   viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = PageNumberPagination
@@ -132,7 +187,7 @@ class UsersViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,),
     )
     def me(self, request):
-        user = get_object_or_404(User, username=self.request.user)
+        user = get_object_or_404(User, pk=self.request.user.pk)
         serializer = UserEditSerializer(user)
         if request.method == 'PATCH':
             serializer = UserEditSerializer(
@@ -158,25 +213,60 @@ class UsersViewSet(viewsets.ModelViewSet):
             UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class TitleReviewMixin:
+    """Родительские объекты маршрута titles/{title_id}/reviews/{review_id}.
+
+    Цепочка проверяется одним запросом с JOIN и запоминается на время
+    запроса: view, сериализатор (context['view']) и права доступа
+    получают один и тот же объект.
+    """
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            if 'review_id' in self.kwargs:
+                self._title = self.get_review().title
+            else:
+                self._title = get_object_or_404(
+                    Title, pk=self.kwargs.get('title_id')
+                )
+        return self._title
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
+
+
+class ReviewViewSet(SerializationTimingMixin, SparseFieldsetMixin,
+                    TitleReviewMixin, ConditionalGetMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    sparse_columns = {'author': ('author', 'author__username')}
+    sparse_required_columns = ('id', 'pub_date')
+    sparse_select_related = {'author': 'author'}
     permission_classes = (
         IsAuthorAdminModerOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly)
-    pagination_class = PageNumberPagination
+    pagination_class = PubDateKeysetPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+    def get_etag_prefixes(self):
+        return (f'reviews:{self.kwargs.get("title_id")}', 'users')
 
     def perform_create(self, serializer):
         serializer.save(
-            author=self.request.user,
+            author=get_db_user(self.request.user),
             title=self.get_title()
         )
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.prune_queryset(
+            self.get_title().reviews.select_related('author')
+        )
 
     @property
     def allowed_methods(self):
@@ -189,7 +279,9 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class GenreViewSet(GetPostDeleteViewSet):
+class GenreViewSet(SparseFieldsetMixin, VersionedCacheListMixin,
+                   GetPostDeleteViewSet):
+    cache_prefix = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (AdminReadOnly,)
@@ -199,19 +291,34 @@ class GenreViewSet(GetPostDeleteViewSet):
     pagination_class = PageNumberPagination
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(SerializationTimingMixin, SparseFieldsetMixin,
+                   ConditionalGetMixin, TitleListCacheMixin,
+                   viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).order_by('id')
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre').order_by('id')
+    sparse_columns = {
+        'rating': ('score_sum', 'review_count'),
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+    sparse_select_related = {'category': 'category'}
+    sparse_prefetch_related = {'genre': 'genre'}
     permission_classes = (AdminReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    bulk_max_items = 10_000
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleSerializer
         return TitleSerializerWrite
 
+    def get_etag_prefixes(self):
+        if self.action == 'retrieve':
+            return ('titles', title_version_prefix(self.kwargs['pk']))
+        return ('titles', 'ratings')
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -225,7 +332,7 @@ class TitleViewSet(viewsets.ModelViewSet):
 
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
-        created_item = Title.objects.get(pk=serializer.data['id'])
+        created_item = self.get_queryset().get(pk=serializer.data['id'])
         response_serializer = TitleSerializer(
             created_item,
             context=self.get_serializer_context()
@@ -236,23 +343,58 @@ class TitleViewSet(viewsets.ModelViewSet):
             headers=headers
         )
 
-
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(methods=['post', 'patch'], detail=False)
+    def bulk(self, request):
+        """Пакетная загрузка (POST) и обновление (PATCH) произведений.
+        Ответ содержит результат по каждому элементу."""
+        if not isinstance(request.data, list):
+            return Response(
+                {'error': 'Ожидается список произведений'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > self.bulk_max_items:
+            return Response(
+                {'error': f'Не больше {self.bulk_max_items} произведений '
+                          'за запрос'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        writer = TitleBulkWriter(
+            request.data, partial=request.method == 'PATCH'
+        )
+        writer.validate()
+        results = writer.save()
+        if writer.errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif writer.partial:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({'results': results}, status=response_status)
+
+
+class CommentViewSet(SerializationTimingMixin, SparseFieldsetMixin,
+                     TitleReviewMixin, ConditionalGetMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для модели Comment"""
 
     serializer_class = CommentSerializer
+    sparse_columns = {'author': ('author', 'author__username')}
+    sparse_required_columns = ('id', 'pub_date')
+    sparse_select_related = {'author': 'author'}
     permission_classes = (IsAuthorAdminModerOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PubDateKeysetPagination
 
-    def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('review_id'))
+    def get_etag_prefixes(self):
+        return (f'comments:{self.kwargs.get("review_id")}', 'users')
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.prune_queryset(
+            self.get_review().comments.select_related('author')
+        )
 
     def perform_create(self, serializer):
         serializer.save(
-            review=self.get_review(), author=self.request.user
+            review=self.get_review(), author=get_db_user(self.request.user)
         )
 
     @property
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 
@@ -28,6 +30,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestTimingMiddleware',
+    'api.middleware.SlowQueryLogMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,10 +68,125 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': str(BASE_DIR / 'db.sqlite3'),
+        'NAME': os.getenv('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        # Соединение переиспользуется запросами потока CONN_MAX_AGE секунд.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# Реплики только для чтения: пути к SQLite-файлам через запятую.
+# Локально их заполняет из default команда refresh_replicas.
+for index, replica_name in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(','))
+):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'NAME': replica_name,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+# Сколько секунд после записи клиент читает из default и сколько
+# реплика может отставать от default.
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+# PRAGMA, которые выполняются при каждом новом соединении с SQLite
+# (api.db). Профиль SQLITE_PROFILE=production включает WAL: читатели
+# не ждут писателей, а писатели ждут друг друга до busy_timeout мс
+# вместо ошибки "database is locked". Профиль default оставляет настройки
+# SQLite по умолчанию. Отдельные значения переопределяются SQLITE_<PRAGMA>.
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+    },
+}
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'production')
+SQLITE_PRAGMAS = {
+    name: os.getenv(f'SQLITE_{name.upper()}', value)
+    for name, value in SQLITE_PROFILES[SQLITE_PROFILE].items()
+}
+
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Кэш ответов API. При нескольких процессах нужен общий бэкенд
+# (Redis, Memcached, файловый), иначе версии не разойдутся по воркерам.
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+# Сколько секунд версия токенов пользователя живёт в кэше. С локальным
+# кэшем процесса это и есть задержка отзыва токенов в других воркерах.
+TOKEN_VERSION_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', 30)
+)
+
+
+# Доля запросов, для которых считаются SQL-запросы и время обработки
+# (заголовок Server-Timing и лог api.timing). 0 выключает замеры,
+# 1 замеряет все запросы.
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.getenv('REQUEST_TIMING_SAMPLE_RATE', 0.01)
+)
+
+# Каталог файлов метрик процессов для /metrics. У каждого развёртывания
+# на хосте должен быть свой; при старте сервиса его стоит очищать.
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'yamdb-metrics')
+)
+
+# Порог медленного SQL-запроса в миллисекундах для лога api.slow_queries
+# (view, место в коде, план запроса). Отрицательное значение выключает лог.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100))
+SLOW_QUERY_LOG_FILE = os.getenv(
+    'SLOW_QUERY_LOG_FILE', BASE_DIR / 'slow_queries.log'
+)
+
+# Ответы короче порога (в байтах) не сжимаются: выигрыш меньше затрат.
+# Отрицательное значение выключает сжатие.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries_file': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            # Файл создаётся только при первой записи.
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'api.slow_queries': {
+            'handlers': ['slow_queries_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 
@@ -102,10 +223,21 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # orjson-версии JSON-рендерера и парсера; без orjson работают
+    # стандартные классы DRF.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 AUTH_USER_MODEL = 'users.User'
@@ -120,5 +252,14 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Очередь писем (users.outbox): письма отправляет команда send_emails.
+# EMAIL_OUTBOX_EAGER отправляет письмо сразу после фиксации транзакции,
+# без воркера (для разработки и тестов).
+EMAIL_OUTBOX_EAGER = os.getenv('EMAIL_OUTBOX_EAGER', 'False') == 'True'
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+# Задержка перед повтором в секундах, удваивается после каждой неудачи.
+EMAIL_OUTBOX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_BACKOFF', 30))
+EMAIL_OUTBOX_MAX_BACKOFF = int(os.getenv('EMAIL_OUTBOX_MAX_BACKOFF', 3600))
+
 MIN_SCORE: int = 1
 MAX_SCORE: int = 10
@@ -13,10 +13,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
 
+from api.compression import PrecompressedFileView
+from api.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
@@ -24,5 +28,11 @@ urlpatterns = [
         TemplateView.as_view(template_name='redoc.html'),
         name='redoc'
     ),
-    path('api/', include('api.urls'))
+    path(
+        'redoc/redoc.yaml',
+        PrecompressedFileView(settings.BASE_DIR / 'static/redoc.yaml'),
+        name='redoc_schema'
+    ),
+    path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,159 @@
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from loguru import logger
+
+
+class Command(BaseCommand):
+    help = "Fills DB with data from .csv files"
+
+    # Порядок важен: каждая таблица загружается после тех,
+    # на которые она ссылается внешними ключами.
+    FILE_DB_TABLE: dict = {
+        "users.csv": "users_user",
+        "category.csv": "reviews_category",
+        "genre.csv": "reviews_genre",
+        "titles.csv": "reviews_title",
+        "genre_title.csv": "reviews_title_genre",
+        "review.csv": "reviews_review",
+        "comments.csv": "reviews_comment",
+    }
+    # Колонки .csv, которые называются в таблице иначе.
+    COLUMN_NAMES: dict = {
+        "author": "author_id",
+        "category": "category_id",
+    }
+    CHUNK_SIZE: int = 10_000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            type=Path,
+            default=settings.BASE_DIR / "static" / "data",
+            help="Directory with .csv files",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=self.CHUNK_SIZE,
+            help="Rows per INSERT batch",
+        )
+
+    def handle(self, *args, **options):
+        logger.info("Starting...")
+        csv_root: Path = options["path"]
+        for file_name, table in self.FILE_DB_TABLE.items():
+            file_path = csv_root / file_name
+            if not file_path.exists():
+                logger.warning(f"Skipping {file_name}: file not found")
+                continue
+            self.write_to_db(file_path, table, options["chunk_size"])
+        # Строки вставлены напрямую, мимо сигналов: пересчитываем
+        # рейтинги и сбрасываем кэш ответов API.
+        call_command("rebuild_ratings")
+        caches[settings.API_CACHE_ALIAS].clear()
+        logger.info("Finished!")
+
+    def table_defaults(self, table: str) -> dict:
+        """Значения для обязательных колонок, которых нет в .csv."""
+        return {
+            "users_user": {
+                "password": "",
+                "is_superuser": False,
+                "is_staff": False,
+                "is_active": True,
+                "date_joined": timezone.now(),
+                "first_name": "",
+                "last_name": "",
+                "bio": "",
+                "role": "user",
+                "token_version": 0,
+            },
+            "reviews_title": {
+                "description": "",
+                "score_sum": 0,
+                "review_count": 0,
+            },
+        }.get(table, {})
+
+    def write_to_db(self, file_path: Path, table: str,
+                    chunk_size: int) -> None:
+        """Основная функция команды "manage.py fill_my_db".
+        1) Принимает путь к файлу .csv и имя таблицы
+        2) Читает файл потоково, пачками по chunk_size строк,
+        так что память не зависит от размера файла
+        3) Записывает пачки в БД в одной транзакции на таблицу
+        4) При ошибке откатывает таблицу и останавливает импорт
+        5) Логирует число строк и скорость загрузки
+        """
+        logger.info(f"Starting import data from {file_path.name}")
+        started = time.perf_counter()
+        rows_count = 0
+        with open(file_path, newline="", encoding="utf-8") as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, None)
+            if not header:
+                logger.warning(f"Skipping {file_path.name}: file is empty")
+                return
+            columns = [self.COLUMN_NAMES.get(name, name) for name in header]
+            defaults = {
+                column: value
+                for column, value in self.table_defaults(table).items()
+                if column not in columns
+            }
+            query = self.make_insert_query(table, [*columns, *defaults])
+            extra = tuple(defaults.values())
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    while True:
+                        chunk = [
+                            self.clean_row(columns, row) + extra
+                            for row in islice(reader, chunk_size)
+                        ]
+                        if not chunk:
+                            break
+                        cursor.executemany(query, chunk)
+                        rows_count += len(chunk)
+            except (DatabaseError, ValueError) as er:
+                raise CommandError(
+                    f"Failed to import {file_path.name} near row "
+                    f"{rows_count + 1}: {er}"
+                ) from er
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Finished import data from {file_path.name}: "
+            f"{rows_count} rows in {elapsed:.2f} s "
+            f"({rows_count / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+
+    @staticmethod
+    def clean_row(columns: list, row: list) -> tuple:
+        """Пустые внешние ключи записываются как NULL."""
+        if len(row) != len(columns):
+            raise ValueError(
+                f"expected {len(columns)} columns, got {len(row)}"
+            )
+        return tuple(
+            None if value == "" and column.endswith("_id") else value
+            for column, value in zip(columns, row)
+        )
+
+    @staticmethod
+    def make_insert_query(table: str, columns: list) -> str:
+        """Возвращает запрос вставки с плейсхолдерами.
+        Пример: "INSERT INTO "users_user" ("id", "username") VALUES (%s, %s)".
+        """
+        quote = connection.ops.quote_name
+        return (
+            f"INSERT INTO {quote(table)} "
+            f"({', '.join(quote(column) for column in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
@@ -0,0 +1,235 @@
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+SYLLABLES = (
+    'ка ло ми ра ту не зо ве ри па до ку ше на ги бо ля фе мо ст'
+).split()
+VOCABULARY_SIZE = 5_000
+# Тексты берутся из заранее собранного пула: генерация строки на каждую
+# вставку была бы самой медленной частью команды.
+TEXT_POOL_SIZE = 4_096
+# Сколько раз добираем авторов отзывов с перекосом к активным
+# пользователям, прежде чем добрать оставшихся равномерно.
+WEIGHTED_ROUNDS = 3
+PUB_DATE_SPAN = timedelta(days=5 * 365)
+
+
+class Command(BaseCommand):
+    help = "Generates a large synthetic dataset for load testing"
+
+    CHUNK_SIZE = 50_000
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--titles', type=int, default=10_000)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--reviews', type=int, default=200_000)
+        parser.add_argument('--comments', type=int, default=200_000)
+        parser.add_argument(
+            '--skew', type=float, default=1.0,
+            help='Zipf exponent of reviews per title',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=self.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = datetime.utcnow()
+        self.vocabulary = self.make_vocabulary()
+        self.text_pools = {}
+        started = time.perf_counter()
+
+        users = self.insert_users(options['users'])
+        categories = self.insert_named(
+            Category, 'category', options['categories']
+        )
+        genres = self.insert_named(Genre, 'genre', options['genres'])
+        titles = self.insert_titles(options['titles'], categories, genres)
+        reviews = self.insert_reviews(
+            options['reviews'], titles, users, options['skew']
+        )
+        self.insert_comments(options['comments'], reviews, users)
+
+        # Строки вставлены напрямую, мимо сигналов.
+        call_command('rebuild_ratings', stdout=self.stdout)
+        caches[settings.API_CACHE_ALIAS].clear()
+        self.stdout.write(
+            f'Done in {time.perf_counter() - started:.1f} s'
+        )
+
+    def make_vocabulary(self):
+        words = set()
+        while len(words) < VOCABULARY_SIZE:
+            words.add(''.join(
+                self.rng.choices(SYLLABLES, k=self.rng.randint(2, 4))
+            ))
+        return sorted(words)
+
+    def text(self, words):
+        if words not in self.text_pools:
+            self.text_pools[words] = [
+                ' '.join(self.rng.choices(self.vocabulary, k=words))
+                for _ in range(TEXT_POOL_SIZE)
+            ]
+        return self.rng.choice(self.text_pools[words])
+
+    def power_law(self, first, count):
+        """Случайный id из [first, first + count) с вероятностью,
+        убывающей примерно как 1/rank (активные пользователи,
+        популярные отзывы)."""
+        return first + int((count + 1) ** self.rng.random()) - 1
+
+    def pub_date(self):
+        offset = self.rng.random() * PUB_DATE_SPAN.total_seconds()
+        return (self.now - timedelta(seconds=offset)).isoformat(' ')
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    def bulk_insert(self, model, columns, rows):
+        """Пачечная вставка в одной транзакции, возвращает число строк."""
+        table = model._meta.db_table
+        quote = connection.ops.quote_name
+        query = (
+            f"INSERT INTO {quote(table)} "
+            f"({', '.join(quote(column) for column in columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        started = time.perf_counter()
+        total = 0
+        rows = iter(rows)
+        with transaction.atomic(), connection.cursor() as cursor:
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                cursor.executemany(query, chunk)
+                total += len(chunk)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{table}: {total} rows in {elapsed:.1f} s '
+            f'({total / elapsed if elapsed else 0:.0f} rows/s)'
+        )
+        return total
+
+    def insert_users(self, count):
+        first = self.next_id(User)
+        date_joined = self.now.isoformat(' ')
+        self.bulk_insert(
+            User,
+            ('id', 'password', 'is_superuser', 'username', 'first_name',
+             'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+             'bio', 'role', 'token_version'),
+            ((pk, '', False, f'user{pk}', '', '', f'user{pk}@yamdb.fake',
+              False, True, date_joined, '', User.USER, 0)
+             for pk in range(first, first + count)),
+        )
+        return first, count
+
+    def insert_named(self, model, prefix, count):
+        first = self.next_id(model)
+        self.bulk_insert(
+            model,
+            ('id', 'name', 'slug'),
+            ((pk, f'{prefix} {pk}', f'{prefix}-{pk}')
+             for pk in range(first, first + count)),
+        )
+        return first, count
+
+    def insert_titles(self, count, categories, genres):
+        first = self.next_id(Title)
+        first_category, categories_count = categories
+        first_genre, genres_count = genres
+        self.bulk_insert(
+            Title,
+            ('id', 'name', 'year', 'description', 'category_id',
+             'score_sum', 'review_count'),
+            ((pk, self.text(3), self.rng.randint(1900, self.now.year),
+              self.text(20),
+              first_category + self.rng.randrange(categories_count),
+              0, 0)
+             for pk in range(first, first + count)),
+        )
+        self.bulk_insert(
+            Title.genre.through,
+            ('title_id', 'genre_id'),
+            ((pk, first_genre + genre)
+             for pk in range(first, first + count)
+             for genre in self.rng.sample(
+                range(genres_count),
+                min(genres_count, self.rng.randint(1, 3))
+            )),
+        )
+        return first, count
+
+    def reviews_per_title(self, total, titles_count, users_count, skew):
+        """Число отзывов на произведение по закону Ципфа: у произведения
+        ранга r их примерно total / r**skew / H. Отзыв от одного автора
+        на произведение один, поэтому больше users_count не бывает."""
+        weights = [1 / rank ** skew for rank in range(1, titles_count + 1)]
+        scale = total / sum(weights)
+        return [min(users_count, round(w * scale)) for w in weights]
+
+    def title_authors(self, count, users):
+        """Различные авторы отзывов одного произведения с перекосом
+        в сторону активных пользователей."""
+        first, users_count = users
+        authors = set()
+        for _ in range(WEIGHTED_ROUNDS):
+            missing = count - len(authors)
+            if not missing:
+                return authors
+            authors.update(
+                self.power_law(first, users_count) for _ in range(missing)
+            )
+        while len(authors) < count:
+            authors.add(first + self.rng.randrange(users_count))
+        return authors
+
+    def insert_reviews(self, total, titles, users, skew):
+        first_title, titles_count = titles
+        first = self.next_id(Review)
+        counts = self.reviews_per_title(
+            total, titles_count, users[1], skew
+        )
+
+        def rows():
+            pk = first
+            for offset, count in enumerate(counts):
+                for author in self.title_authors(count, users):
+                    yield (pk, first_title + offset, author, self.text(30),
+                           self.rng.randint(1, 10), self.pub_date())
+                    pk += 1
+
+        inserted = self.bulk_insert(
+            Review,
+            ('id', 'title_id', 'author_id', 'text', 'score', 'pub_date'),
+            rows(),
+        )
+        return first, inserted
+
+    def insert_comments(self, total, reviews, users):
+        first_review, reviews_count = reviews
+        if not reviews_count:
+            return
+        first = self.next_id(Comment)
+        self.bulk_insert(
+            Comment,
+            ('id', 'review_id', 'author_id', 'text', 'pub_date'),
+            ((pk, self.power_law(first_review, reviews_count),
+              self.power_law(*users), self.text(15), self.pub_date())
+             for pk in range(first, first + total)),
+        )
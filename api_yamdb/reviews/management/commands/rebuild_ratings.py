@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.models import Review, Title
+from reviews.signals import title_rating_changed
+
+
+class Command(BaseCommand):
+    help = "Rebuilds stored title ratings from the reviews table"
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        with transaction.atomic():
+            updated = Title.objects.update(
+                score_sum=Coalesce(
+                    Subquery(
+                        reviews.annotate(total=Sum('score')).values('total')
+                    ),
+                    0,
+                ),
+                review_count=Coalesce(
+                    Subquery(
+                        reviews.annotate(total=Count('id')).values('total')
+                    ),
+                    0,
+                ),
+            )
+        title_rating_changed.send(sender=Title, title_id=None)
+        self.stdout.write(f"Rebuilt ratings for {updated} titles")
@@ -68,6 +68,16 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанр',
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ('name',)
@@ -77,6 +87,13 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по хранимым сумме и количеству отзывов."""
+        if not self.review_count:
+            return None
+        return self.score_sum // self.review_count
+
 
 class Review(models.Model):
     """Модель отзывов."""
@@ -86,7 +103,7 @@ class Review(models.Model):
         on_delete=models.CASCADE,
         related_name='reviews',
         verbose_name='Произведение',
-        db_index=True
+        db_index=False
     )
     text = models.TextField(
         'Текст отзыва',
@@ -121,12 +138,29 @@ class Review(models.Model):
                 name='unique_title_author'
             ),
         )
+        # Покрывает выборку отзывов произведения по дате публикации,
+        # в том числе в режиме курсора по (pub_date, id).
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженную оценку, чтобы при сохранении
+        обновить рейтинг произведения на разницу."""
+        instance = super().from_db(db, field_names, values)
+        if 'score' in field_names:
+            instance._loaded_score = instance.score
+        return instance
+
 
 class Comment(models.Model):
     """Модель комментариев."""
@@ -136,7 +170,7 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments',
         verbose_name='Отзыв',
-        db_index=True
+        db_index=False
     )
     text = models.TextField(
         verbose_name='Текст комментария'
@@ -156,6 +190,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
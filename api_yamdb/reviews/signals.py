@@ -0,0 +1,33 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Review, Title
+
+# Отправляется после изменения рейтинга; title_id=None — пересчитаны все.
+title_rating_changed = Signal()
+
+
+def update_title_rating(title_id, score_delta, count_delta=0):
+    """Сдвигает хранимые сумму оценок и число отзывов произведения."""
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+    )
+    title_rating_changed.send(sender=Title, title_id=title_id)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    if created:
+        update_title_rating(instance.title_id, instance.score, 1)
+    else:
+        old_score = getattr(instance, '_loaded_score', instance.score)
+        if old_score != instance.score:
+            update_title_rating(instance.title_id, instance.score - old_score)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_title_rating(instance.title_id, -instance.score, -1)
@@ -0,0 +1,51 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from users.outbox import claim_batch, deliver
+
+
+class Command(BaseCommand):
+    help = "Sends queued emails from the outbox"
+
+    BATCH_SIZE = 100
+    POLL_INTERVAL = 5.0
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=self.BATCH_SIZE,
+            help='Emails claimed per batch',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=self.POLL_INTERVAL,
+            help='Seconds to wait when the outbox is empty',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when no emails are ready instead of polling',
+        )
+
+    def handle(self, *args, **options):
+        # Одно соединение с почтовым сервером на всё время работы.
+        connection = get_connection()
+        total_sent = total_failed = 0
+        try:
+            while True:
+                batch = claim_batch(options['batch_size'])
+                if not batch:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                sent, failed = deliver(batch, connection)
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.stdout.write(
+            f'Done: sent {total_sent}, failed {total_failed}'
+        )
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -10,6 +11,9 @@ class User(AbstractUser):
     MODERATOR = 'moderator'
     ADMIN = 'admin'
 
+    # Поля, от которых зависят права, записанные в токен.
+    TOKEN_CLAIM_FIELDS = ('role', 'is_superuser', 'is_active')
+
     CHOICES_ROLE = (
         (USER, 'Пользователь'),
         (MODERATOR, 'Модератор'),
@@ -46,12 +50,47 @@ class User(AbstractUser):
         default=USER,
         choices=CHOICES_ROLE,
     )
+    # Увеличивается при смене роли или статуса (сигнал pre_save в api).
+    # При QuerySet.update() этих полей её нужно увеличить вручную.
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('id',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные роль и статус, чтобы при их
+        изменении отозвать выданные токены, и username, чтобы при его
+        изменении сбросить кэш отзывов и комментариев."""
+        instance = super().from_db(db, field_names, values)
+        if set(cls.TOKEN_CLAIM_FIELDS).issubset(field_names):
+            instance._loaded_token_claims = instance.token_claims()
+        if 'username' in field_names:
+            instance._loaded_username = instance.username
+        return instance
+
+    def token_claims(self):
+        return {name: getattr(self, name) for name in self.TOKEN_CLAIM_FIELDS}
+
+    def token_claims_changed(self):
+        loaded = getattr(self, '_loaded_token_claims', None)
+        return loaded is not None and loaded != self.token_claims()
+
+    def save(self, *args, **kwargs):
+        # Версию токенов при смене роли или статуса увеличивает сигнал
+        # pre_save в api; с update_fields она тоже должна попасть в БД,
+        # иначе после истечения кэша старый токен снова станет валидным.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.token_claims_changed():
+            kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+
     @property
     def is_user(self):
         return self.role == self.USER
@@ -66,3 +105,39 @@ class User(AbstractUser):
 
     def __str__(self) -> str:
         return self.username
+
+
+class OutboxEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Письма записываются в одной транзакции с данными, ради которых
+    отправляются, а отправляет их команда send_emails.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('next_attempt_at', 'id')
+        indexes = (
+            # Обходятся только неотправленные письма.
+            models.Index(
+                fields=('next_attempt_at', 'id'),
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_email_pending_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.recipient}: {self.subject}'
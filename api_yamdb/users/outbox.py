@@ -0,0 +1,108 @@
+"""Очередь исходящих писем (transactional outbox).
+
+Запрос только записывает письмо в таблицу OutboxEmail; задержки
+и ошибки почтового сервера его не касаются. Команда send_emails
+забирает письма пачками и отправляет через одно соединение, неудачные
+попытки повторяются с экспоненциальной задержкой.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# На это время забранные письма скрыты от других воркеров.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue_email(subject, body, from_email, recipient):
+    """Ставит письмо в очередь. Вызывается внутри транзакции с данными,
+    к которым относится письмо: при откате письмо тоже пропадёт."""
+    message = OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient,
+    )
+    if settings.EMAIL_OUTBOX_EAGER:
+        transaction.on_commit(lambda: deliver([message]))
+    return message
+
+
+def pending(now=None):
+    return OutboxEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        next_attempt_at__lte=now or timezone.now(),
+    )
+
+
+def claim_batch(size):
+    """Забирает пачку писем, готовых к отправке. Там, где БД это
+    поддерживает, строки блокируются, а уже заблокированные
+    пропускаются, так что воркеров может быть несколько."""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            pending(now).select_for_update(skip_locked=True)
+            .order_by('next_attempt_at', 'id')[:size]
+        )
+        OutboxEmail.objects.filter(
+            pk__in=[message.pk for message in batch]
+        ).update(next_attempt_at=now + LEASE)
+    return batch
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: удваивается с каждой
+    неудачей, но не больше EMAIL_OUTBOX_MAX_BACKOFF."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_BACKOFF,
+    ))
+
+
+def deliver(messages, connection=None):
+    """Отправляет письма через одно соединение и записывает результат.
+    Возвращает число отправленных и неудачных писем."""
+    own_connection = connection is None
+    if own_connection:
+        connection = get_connection()
+    sent, failed = [], []
+    try:
+        # Уже открытое соединение переиспользуется.
+        connection.open()
+    except Exception as error:
+        failed = [(message, error) for message in messages]
+    else:
+        for message in messages:
+            try:
+                EmailMessage(
+                    message.subject,
+                    message.body,
+                    message.from_email,
+                    [message.recipient],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                failed.append((message, error))
+            else:
+                sent.append(message.pk)
+    if failed or own_connection:
+        # После ошибки соединение может быть разорвано: следующая
+        # пачка откроет новое.
+        connection.close()
+
+    now = timezone.now()
+    OutboxEmail.objects.filter(pk__in=sent).update(sent_at=now)
+    for message, error in failed:
+        message.attempts += 1
+        message.last_error = f'{type(error).__name__}: {error}'
+        message.next_attempt_at = now + retry_delay(message.attempts)
+        message.save(
+            update_fields=('attempts', 'last_error', 'next_attempt_at')
+        )
+    return len(sent), len(failed)
@@ -0,0 +1,513 @@
+"""Сквозной бенчмарк задержек API /v1/ через тестовый клиент Django.
+
+Генерирует данные командой generate_dataset во временной БД, прогоняет
+каждый маршрут заданное число раз и считает p50/p95/p99 задержки,
+число SQL-запросов на запрос и пик выделенной памяти (tracemalloc).
+Результаты пишутся в JSON; при переданном --baseline маршруты сравниваются
+с сохранённым прогоном, и команда завершается с кодом 1, если какой-то
+маршрут стал медленнее порога или делает больше запросов.
+
+Пример:
+    python benchmarks/api_latency.py --output bench.json
+    python benchmarks/api_latency.py --baseline bench.json --threshold 0.2
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from io import StringIO
+from itertools import count
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+# Разница меньше этой считается шумом, даже если превышает порог.
+NOISE_FLOOR_MS = 1.0
+MEMORY_ITERATIONS = 5
+
+
+class Context:
+    """Клиенты и объекты, на которые ссылаются маршруты."""
+
+    def __init__(self):
+        from django.contrib.auth.tokens import default_token_generator
+        from rest_framework.test import APIClient
+
+        from api.authentication import get_access_token
+        from reviews.models import Category, Genre, Review, Title, User
+
+        self.token_generator = default_token_generator
+        self.admin = User.objects.create_user(
+            username='bench-admin', email='bench-admin@yamdb.fake',
+            role=User.ADMIN,
+        )
+        self.user = User.objects.create_user(
+            username='bench-user', email='bench-user@yamdb.fake',
+        )
+        self.anon_client = APIClient()
+        self.admin_client = APIClient()
+        # Токены как у TokenApiView: права проверяются по их полям.
+        self.admin_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.admin)}'
+        )
+        self.user_client = APIClient()
+        self.user_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}'
+        )
+        # Первое произведение — самое популярное в generate_dataset.
+        self.title = Title.objects.order_by('id').first()
+        self.review = Review.objects.filter(title=self.title).first()
+        self.category = Category.objects.order_by('id').first()
+        self.genre = Genre.objects.order_by('id').first()
+        self.title_ids = list(
+            Title.objects.order_by('-id').values_list('id', flat=True)
+        )
+        self.sequence = count()
+
+    @property
+    def reviews_url(self):
+        return f'/api/v1/titles/{self.title.id}/reviews/'
+
+    @property
+    def comments_url(self):
+        return f'{self.reviews_url}{self.review.id}/comments/'
+
+    def unique(self, prefix):
+        return f'{prefix}{next(self.sequence)}'
+
+
+TITLES_URL = '/api/v1/titles/'
+BULK_URL = '/api/v1/titles/bulk/'
+# Произведений в одном запросе к titles/bulk/.
+BULK_SIZE = 20
+
+
+def repeat(make_client_and_url):
+    """Маршрут из одинаковых GET-запросов."""
+    def requests(ctx, iterations):
+        client, url, params = make_client_and_url(ctx)
+        for _ in range(iterations):
+            yield lambda: client.get(url, params)
+    return requests
+
+
+def review_create(ctx, iterations):
+    for title_id in ctx.title_ids[:iterations]:
+        yield lambda title_id=title_id: ctx.user_client.post(
+            f'{TITLES_URL}{title_id}/reviews/',
+            {'text': 'Бенчмарк', 'score': 7},
+        )
+
+
+def review_patch(ctx, iterations):
+    for index in range(iterations):
+        yield lambda index=index: ctx.admin_client.patch(
+            f'{ctx.reviews_url}{ctx.review.id}/', {'score': index % 10 + 1},
+        )
+
+
+def review_delete(ctx, iterations):
+    from reviews.models import Review
+
+    for title_id in ctx.title_ids[-iterations:]:
+        review = Review.objects.create(
+            title_id=title_id, author=ctx.admin, text='del', score=5
+        )
+        yield lambda url=f'{TITLES_URL}{title_id}/reviews/{review.id}/': (
+            ctx.admin_client.delete(url)
+        )
+
+
+def comment_create(ctx, iterations):
+    for _ in range(iterations):
+        yield lambda: ctx.user_client.post(
+            ctx.comments_url, {'text': 'Бенчмарк'}
+        )
+
+
+def comment_patch(ctx, iterations):
+    from reviews.models import Comment
+
+    comment = Comment.objects.create(
+        review=ctx.review, author=ctx.user, text='patch'
+    )
+    for _ in range(iterations):
+        yield lambda: ctx.user_client.patch(
+            f'{ctx.comments_url}{comment.id}/', {'text': 'Бенчмарк'}
+        )
+
+
+def comment_delete(ctx, iterations):
+    from reviews.models import Comment
+
+    for _ in range(iterations):
+        comment = Comment.objects.create(
+            review=ctx.review, author=ctx.user, text='del'
+        )
+        yield lambda url=f'{ctx.comments_url}{comment.id}/': (
+            ctx.user_client.delete(url)
+        )
+
+
+def signup(ctx, iterations):
+    for _ in range(iterations):
+        username = ctx.unique('signup')
+        yield lambda username=username: ctx.anon_client.post(
+            '/api/v1/auth/signup/',
+            {'username': username, 'email': f'{username}@yamdb.fake'},
+        )
+
+
+def token(ctx, iterations):
+    from reviews.models import User
+
+    for _ in range(iterations):
+        username = ctx.unique('token')
+        user = User.objects.create_user(
+            username=username, email=f'{username}@yamdb.fake'
+        )
+        data = {
+            'username': username,
+            'confirmation_code': ctx.token_generator.make_token(user),
+        }
+        yield lambda data=data: ctx.anon_client.post(
+            '/api/v1/auth/token/', data
+        )
+
+
+def user_create(ctx, iterations):
+    for _ in range(iterations):
+        username = ctx.unique('created')
+        yield lambda username=username: ctx.admin_client.post(
+            '/api/v1/users/',
+            {'username': username, 'email': f'{username}@yamdb.fake'},
+        )
+
+
+def user_patch(ctx, iterations):
+    for index in range(iterations):
+        yield lambda index=index: ctx.admin_client.patch(
+            f'/api/v1/users/{ctx.user.username}/', {'bio': f'bio {index}'}
+        )
+
+
+def user_delete(ctx, iterations):
+    from reviews.models import User
+
+    for _ in range(iterations):
+        username = ctx.unique('deleted')
+        User.objects.create_user(
+            username=username, email=f'{username}@yamdb.fake'
+        )
+        yield lambda username=username: ctx.admin_client.delete(
+            f'/api/v1/users/{username}/'
+        )
+
+
+def title_create(ctx, iterations):
+    for _ in range(iterations):
+        yield lambda: ctx.admin_client.post(TITLES_URL, {
+            'name': ctx.unique('Бенчмарк '), 'year': 2000,
+            'genre': [ctx.genre.slug], 'category': ctx.category.slug,
+        })
+
+
+def title_patch(ctx, iterations):
+    for index in range(iterations):
+        yield lambda index=index: ctx.admin_client.patch(
+            f'{TITLES_URL}{ctx.title.id}/', {'description': f'desc {index}'}
+        )
+
+
+def title_delete(ctx, iterations):
+    from reviews.models import Title
+
+    for _ in range(iterations):
+        title = Title.objects.create(name='del', year=2000)
+        yield lambda url=f'{TITLES_URL}{title.id}/': (
+            ctx.admin_client.delete(url)
+        )
+
+
+def slug_create(url):
+    """Создание категории или жанра."""
+    def requests(ctx, iterations):
+        for _ in range(iterations):
+            slug = ctx.unique('bench-')
+            yield lambda slug=slug: ctx.admin_client.post(
+                url, {'name': slug, 'slug': slug}
+            )
+    return requests
+
+
+def slug_delete(url, model_name):
+    """Удаление категории или жанра."""
+    def requests(ctx, iterations):
+        from reviews import models
+
+        model = getattr(models, model_name)
+        for _ in range(iterations):
+            slug = ctx.unique('deleted-')
+            model.objects.create(name=slug, slug=slug)
+            yield lambda slug=slug: ctx.admin_client.delete(f'{url}{slug}/')
+    return requests
+
+
+def bulk_items(ctx):
+    return [
+        {'name': ctx.unique('Пакет '), 'year': 2000,
+         'genre': [ctx.genre.slug], 'category': ctx.category.slug}
+        for _ in range(BULK_SIZE)
+    ]
+
+
+def titles_bulk_create(ctx, iterations):
+    for _ in range(iterations):
+        items = bulk_items(ctx)
+        yield lambda items=items: ctx.admin_client.post(
+            BULK_URL, items, format='json'
+        )
+
+
+def titles_bulk_patch(ctx, iterations):
+    ids = ctx.title_ids[:BULK_SIZE]
+    for index in range(iterations):
+        items = [
+            {'id': title_id, 'description': f'desc {index}',
+             'genre': [ctx.genre.slug]}
+            for title_id in ids
+        ]
+        yield lambda items=items: ctx.admin_client.patch(
+            BULK_URL, items, format='json'
+        )
+
+
+def export(url):
+    """Потоковая выгрузка, прочитанная целиком."""
+    def requests(ctx, iterations):
+        def call():
+            response = ctx.admin_client.get(url)
+            b''.join(response.streaming_content)
+            return response
+
+        for _ in range(iterations):
+            yield call
+    return requests
+
+
+# Маршруты: имя и генератор готовых к вызову запросов. Подготовка
+# (создание удаляемых объектов, кодов подтверждения) выполняется
+# в генераторе до yield и в замер не попадает.
+ROUTES = {
+    'categories list': repeat(
+        lambda ctx: (ctx.anon_client, '/api/v1/categories/', None)),
+    'category create': slug_create('/api/v1/categories/'),
+    'category delete': slug_delete('/api/v1/categories/', 'Category'),
+    'genres list': repeat(
+        lambda ctx: (ctx.anon_client, '/api/v1/genres/', None)),
+    'genre create': slug_create('/api/v1/genres/'),
+    'genre delete': slug_delete('/api/v1/genres/', 'Genre'),
+    'titles list': repeat(
+        lambda ctx: (ctx.anon_client, TITLES_URL, None)),
+    'titles filter genre': repeat(lambda ctx: (
+        ctx.anon_client, TITLES_URL, {'genre': ctx.genre.slug})),
+    'titles filter category+year': repeat(lambda ctx: (
+        ctx.anon_client, TITLES_URL,
+        {'category': ctx.category.slug, 'year': ctx.title.year})),
+    'titles filter name': repeat(lambda ctx: (
+        ctx.anon_client, TITLES_URL, {'name': ctx.title.name.split()[0]})),
+    'titles search': repeat(lambda ctx: (
+        ctx.anon_client, TITLES_URL, {'search': ctx.title.name.split()[0]})),
+    'title detail': repeat(lambda ctx: (
+        ctx.anon_client, f'{TITLES_URL}{ctx.title.id}/', None)),
+    'title create': title_create,
+    'title patch': title_patch,
+    'title delete': title_delete,
+    'titles bulk create': titles_bulk_create,
+    'titles bulk patch': titles_bulk_patch,
+    'reviews list': repeat(
+        lambda ctx: (ctx.anon_client, ctx.reviews_url, None)),
+    'reviews list cursor': repeat(lambda ctx: (
+        ctx.anon_client, ctx.reviews_url, {'pagination': 'cursor'})),
+    'review detail': repeat(lambda ctx: (
+        ctx.anon_client, f'{ctx.reviews_url}{ctx.review.id}/', None)),
+    'review create': review_create,
+    'review patch': review_patch,
+    'review delete': review_delete,
+    'comments list': repeat(
+        lambda ctx: (ctx.anon_client, ctx.comments_url, None)),
+    'comment create': comment_create,
+    'comment patch': comment_patch,
+    'comment delete': comment_delete,
+    'auth signup': signup,
+    'auth token': token,
+    'users list': repeat(
+        lambda ctx: (ctx.admin_client, '/api/v1/users/', None)),
+    'users me': repeat(
+        lambda ctx: (ctx.user_client, '/api/v1/users/me/', None)),
+    'user create': user_create,
+    'user patch': user_patch,
+    'user delete': user_delete,
+    'export titles': export('/api/v1/export/titles/'),
+    'export reviews': export('/api/v1/export/reviews/'),
+    'export comments': export('/api/v1/export/comments/'),
+}
+
+
+def percentile(samples, percent):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def run_route(requests, ctx, iterations, cold):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    latencies, queries, statuses = [], [], set()
+    for call in requests(ctx, iterations):
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = call()
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        statuses.add(response.status_code)
+
+    peaks = []
+    for call in requests(ctx, MEMORY_ITERATIONS):
+        if cold:
+            cache.clear()
+        tracemalloc.start()
+        call()
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries': round(statistics.mean(queries), 2),
+        'peak_memory_kib': round(max(peaks) / 1024, 1) if peaks else 0,
+        'statuses': sorted(statuses),
+    }
+
+
+def compare(results, baseline, threshold, noise_floor):
+    """Возвращает список регрессий относительно сохранённого прогона."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            limit = previous[metric] * (1 + threshold)
+            if (current[metric] > limit
+                    and current[metric] - previous[metric] > noise_floor):
+                regressions.append(
+                    f'{name}: {metric} {previous[metric]} -> '
+                    f'{current[metric]}'
+                )
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: queries {previous["queries"]} -> '
+                f'{current["queries"]}'
+            )
+    return regressions
+
+
+def print_results(results):
+    print(f'{"route":30} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} '
+          f'{"queries":>8} {"peak KiB":>9}  statuses')
+    for name, row in results.items():
+        print(f'{name:30} {row["p50_ms"]:9.3f} {row["p95_ms"]:9.3f} '
+              f'{row["p99_ms"]:9.3f} {row["queries"]:8} '
+              f'{row["peak_memory_kib"]:9} '
+              f' {",".join(map(str, row["statuses"]))}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--titles', type=int, default=2_000)
+    parser.add_argument('--reviews', type=int, default=50_000)
+    parser.add_argument('--comments', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument(
+        '--cold', action='store_true',
+        help='Clear the response cache before every request',
+    )
+    parser.add_argument('--route', action='append',
+                        help='Run only the given routes')
+    parser.add_argument('--output', type=Path,
+                        help='Write JSON results to this file')
+    parser.add_argument('--baseline', type=Path,
+                        help='JSON results to compare against')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='Allowed relative latency growth, 0.2 means +20%%',
+    )
+    parser.add_argument(
+        '--noise-floor', type=float, default=NOISE_FLOOR_MS,
+        help='Ignore latency growth below this many milliseconds',
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    call_command(
+        'generate_dataset', users=args.users, titles=args.titles,
+        reviews=args.reviews, comments=args.comments, seed=args.seed,
+        stdout=StringIO(),
+    )
+    ctx = Context()
+
+    results = {}
+    for name, requests in ROUTES.items():
+        if args.route and name not in args.route:
+            continue
+        results[name] = run_route(requests, ctx, args.iterations, args.cold)
+    print_results(results)
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {
+                'iterations': args.iterations,
+                'cold': args.cold,
+                'dataset': {
+                    'users': args.users, 'titles': args.titles,
+                    'reviews': args.reviews, 'comments': args.comments,
+                    'seed': args.seed,
+                },
+            },
+            'routes': results,
+        }, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())['routes']
+        regressions = compare(
+            results, baseline, args.threshold, args.noise_floor
+        )
+        if regressions:
+            print('\nRegressions:')
+            print('\n'.join(f'  {line}' for line in regressions))
+            return 1
+        print('\nNo regressions against the baseline.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
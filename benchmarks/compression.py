@@ -0,0 +1,83 @@
+"""Бенчмарк сжатия ответов списка произведений.
+
+Заполняет БД командой generate_dataset и для страниц разного размера
+замеряет размер ответа без сжатия и со сжатием, а также задержку
+горячей (закэшированной) страницы: без сжатия, со сжатием на каждом
+запросе и со сжатыми байтами из кэша.
+
+Пример:
+    python benchmarks/compression.py --page-sizes 10 100 1000
+"""
+import argparse
+import statistics
+import sys
+import time
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def median_ms(client, requests, **headers):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(TITLES_URL, **headers)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(timings) * 1000, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--page-sizes', type=int, nargs='+', default=[10, 100, 1000]
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from rest_framework.pagination import PageNumberPagination
+    from rest_framework.test import APIClient
+
+    from api.cache import VersionedCacheListMixin, get_cache
+    from api.compression import ENCODINGS
+
+    call_command(
+        'generate_dataset', users=100, titles=max(args.page_sizes),
+        reviews=0, comments=0, stdout=StringIO(),
+    )
+    # LocMemCache по умолчанию хранит 300 записей, а страница из 1000
+    # произведений держит в кэше 1000 версий: записи вытеснялись бы.
+    get_cache()._max_entries = 1_000_000
+    client = APIClient()
+    precompressible = VersionedCacheListMixin.__dict__['is_precompressible']
+
+    print(f'{"page":>5} {"encoding":>8} {"bytes":>9} {"ratio":>6} '
+          f'{"plain, ms":>10} {"each, ms":>9} {"cached, ms":>11}')
+    for page_size in args.page_sizes:
+        PageNumberPagination.page_size = page_size
+        for encoding in ENCODINGS:
+            get_cache().clear()
+            plain, size = median_ms(client, args.requests)
+            headers = {'HTTP_ACCEPT_ENCODING': encoding}
+            # Сжатие на каждом запросе: сжатые байты не сохраняются.
+            VersionedCacheListMixin.is_precompressible = staticmethod(
+                lambda request: False
+            )
+            each, compressed = median_ms(client, args.requests, **headers)
+            VersionedCacheListMixin.is_precompressible = precompressible
+            cached, _ = median_ms(client, args.requests, **headers)
+            print(f'{page_size:5} {encoding:>8} {compressed:9} '
+                  f'{size / compressed:5.1f}x {plain:10.2f} {each:9.2f} '
+                  f'{cached:11.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
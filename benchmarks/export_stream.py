@@ -0,0 +1,107 @@
+"""Бенчмарк потоковой выгрузки отзывов /api/v1/export/reviews/.
+
+Заполняет БД командой generate_dataset и выгружает все отзывы одним
+потоковым ответом: время до первой пачки, строк в секунду и пик памяти
+(tracemalloc, отдельным проходом). Для сравнения отзывы части
+произведений выгружаются постранично через /api/v1/titles/{id}/reviews/.
+
+Пример:
+    python benchmarks/export_stream.py --reviews 200000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+EXPORT_URL = '/api/v1/export/reviews/'
+
+
+def consume(client):
+    """Читает выгрузку; возвращает время до первой пачки и число строк."""
+    started = time.perf_counter()
+    response = client.get(EXPORT_URL)
+    assert response.status_code == 200, response.status_code
+    first_chunk = None
+    lines = 0
+    for chunk in response.streaming_content:
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+        lines += chunk.count(b'\n')
+    response.close()
+    return first_chunk, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=1_000)
+    parser.add_argument('--reviews', type=int, default=200_000)
+    parser.add_argument(
+        '--paging-titles', type=int, default=50,
+        help='Titles whose reviews are also read page by page',
+    )
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+
+    from api.authentication import get_access_token
+    from reviews.models import Review, Title, User
+
+    print(f'Filling {db_path}...')
+    call_command(
+        'generate_dataset', users=5_000, titles=args.titles,
+        reviews=args.reviews, comments=0, stdout=StringIO(),
+    )
+    admin = User.objects.create_user(
+        username='bench-admin', email='bench-admin@yamdb.fake',
+        role=User.ADMIN,
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {get_access_token(admin)}'
+    )
+
+    # Первый запрос процесса платит за импорты и прогрев, не за выгрузку.
+    client.get(EXPORT_URL, {'since': '2999-01-01T00:00:00Z'}).close()
+    started = time.perf_counter()
+    first_chunk, lines = consume(client)
+    elapsed = time.perf_counter() - started
+    assert lines == Review.objects.count()
+
+    tracemalloc.start()
+    consume(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    title_ids = list(
+        Title.objects.order_by('-review_count').values_list('id', flat=True)
+    )[:args.paging_titles]
+    paged = 0
+    started = time.perf_counter()
+    for title_id in title_ids:
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        while url:
+            page = client.get(url).json()
+            paged += len(page['results'])
+            url = page['next']
+    paging = time.perf_counter() - started
+
+    print(f'\n{"mode":20} {"rows":>9} {"seconds":>8} {"rows/s":>9}')
+    print(f'{"export stream":20} {lines:9} {elapsed:8.2f} '
+          f'{lines / elapsed:9.0f}')
+    print(f'{"paginated reviews":20} {paged:9} {paging:8.2f} '
+          f'{paged / paging:9.0f}')
+    print(f'\nfirst chunk after {first_chunk * 1000:.1f} ms, '
+          f'peak traced memory {peak / 2 ** 20:.1f} MiB')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
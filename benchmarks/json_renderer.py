@@ -0,0 +1,91 @@
+"""Бенчмарк JSON-рендерера и парсера: JSONRenderer DRF против FastJSONRenderer.
+
+Заполняет БД командой generate_dataset, сериализует страницы
+произведений и отзывов разного размера и замеряет только рендеринг
+уже готовых данных (и разбор полученного JSON) каждым классом.
+Перед замером проверяет, что вывод совпадает байт в байт.
+
+Пример:
+    python benchmarks/json_renderer.py --page-sizes 10 100 1000
+"""
+import argparse
+import sys
+import timeit
+from io import BytesIO, StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+
+def best_of(func, repeat):
+    """Лучшее время одного вызова в микросекундах."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--page-sizes', type=int, nargs='+', default=[10, 100, 1000]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import ReviewSerializer, TitleSerializer
+    from api.views import TitleViewSet
+    from reviews.models import Review
+
+    if orjson is None:
+        print('orjson is not installed: FastJSONRenderer falls back '
+              'to JSONRenderer.')
+    size = max(args.page_sizes)
+    call_command(
+        'generate_dataset', users=1_000, titles=size, reviews=size,
+        comments=0, stdout=StringIO(),
+    )
+    titles = list(TitleViewSet.queryset[:size])
+    reviews = list(
+        Review.objects.select_related('author').order_by('id')[:size]
+    )
+
+    print(f'{"page":14} {"size":>6} {"bytes":>9} {"drf, us":>10} '
+          f'{"fast, us":>10} {"speedup":>8} {"parse":>8}')
+    for name, serializer_class, objects in (
+        ('titles', TitleSerializer, titles),
+        ('reviews', ReviewSerializer, reviews),
+    ):
+        for page_size in args.page_sizes:
+            data = {
+                'count': len(objects), 'next': None, 'previous': None,
+                'results': serializer_class(
+                    objects[:page_size], many=True
+                ).data,
+            }
+            content = FastJSONRenderer().render(data)
+            assert content == JSONRenderer().render(data), name
+            drf = best_of(lambda: JSONRenderer().render(data), args.repeat)
+            fast = best_of(
+                lambda: FastJSONRenderer().render(data), args.repeat
+            )
+            parse = best_of(
+                lambda: JSONParser().parse(BytesIO(content)), args.repeat
+            ) / best_of(
+                lambda: FastJSONParser().parse(BytesIO(content)), args.repeat
+            )
+            print(f'{name:14} {page_size:6} {len(content):9} {drf:10.1f} '
+                  f'{fast:10.1f} {drf / fast:7.1f}x {parse:7.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Бенчмарк составных индексов отзывов и комментариев.
+
+Заполняет временную БД миллионами отзывов, печатает EXPLAIN QUERY PLAN
+и время горячих запросов сначала на составных индексах
+``(title_id, pub_date, id)`` / ``(review_id, pub_date, id)``, а затем на
+прежних одиночных индексах по ``title_id``, ``review_id`` и ``pub_date``.
+
+Пример:
+    python benchmarks/review_indexes.py --reviews 2000000 --titles 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+CHUNK_SIZE = 50_000
+COMPOSITE_INDEXES = (
+    'review_title_pub_date_idx',
+    'comment_review_pub_date_idx',
+)
+SINGLE_COLUMN_INDEXES = (
+    ('reviews_review_title_id_single', 'reviews_review', 'title_id'),
+    ('reviews_comment_review_id_single', 'reviews_comment', 'review_id'),
+)
+
+
+def fill_database(cursor, reviews, titles, comments):
+    """Быстрая вставка данных напрямую через executemany."""
+    authors = reviews // titles + 1
+    cursor.executemany(
+        "INSERT INTO users_user (id, password, is_superuser, username, "
+        "first_name, last_name, email, is_staff, is_active, date_joined, "
+        "bio, role, token_version) VALUES (?, '', 0, ?, '', '', ?, 0, 1, "
+        "'2024-01-01 00:00:00', '', 'user', 0)",
+        ((pk, f'user{pk}', f'user{pk}@yamdb.fake')
+         for pk in range(1, authors + 1)),
+    )
+    cursor.executemany(
+        "INSERT INTO reviews_title (id, name, year, description, "
+        "score_sum, review_count) VALUES (?, ?, 2000, '', 0, 0)",
+        ((pk, f'title{pk}') for pk in range(1, titles + 1)),
+    )
+    for start in range(0, reviews, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, reviews)
+        cursor.executemany(
+            "INSERT INTO reviews_review (id, title_id, author_id, text, "
+            "score, pub_date) VALUES (?, ?, ?, 'text', 5, "
+            "datetime(1700000000 + ?, 'unixepoch'))",
+            ((pk + 1, pk % titles + 1, pk // titles + 1, pk)
+             for pk in range(start, stop)),
+        )
+    cursor.executemany(
+        "INSERT INTO reviews_comment (id, review_id, author_id, text, "
+        "pub_date) VALUES (?, ?, 1, 'text', "
+        "datetime(1700000000 + ?, 'unixepoch'))",
+        ((pk + 1, pk % 100 + 1, pk) for pk in range(comments)),
+    )
+    cursor.execute('ANALYZE')
+
+
+def hot_queries(title_id, review_id, author_id, page_size):
+    from reviews.models import Comment, Review
+
+    return (
+        ('reviews of title by -pub_date',
+         Review.objects.filter(title_id=title_id)
+         .select_related('author')[:page_size]),
+        ('reviews of title, keyset page',
+         Review.objects.filter(title_id=title_id)
+         .order_by('-pub_date', '-id')[page_size:page_size * 2]),
+        ('reviews of title, COUNT(*)',
+         Review.objects.filter(title_id=title_id)),
+        ('comments of review by -pub_date',
+         Comment.objects.filter(review_id=review_id)
+         .select_related('author')[:page_size]),
+        ('has user reviewed title',
+         Review.objects.filter(title_id=title_id, author_id=author_id)),
+    )
+
+
+def measure(connection, repeat, title_id, review_id, author_id, page_size):
+    results = {}
+    with connection.cursor() as cursor:
+        for name, queryset in hot_queries(
+            title_id, review_id, author_id, page_size
+        ):
+            if name.endswith('COUNT(*)'):
+                sql, params = queryset.order_by().query.sql_with_params()
+                sql = f'SELECT COUNT(*) FROM ({sql})'
+            else:
+                sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+            started = time.perf_counter()
+            for _ in range(repeat):
+                cursor.execute(sql, params)
+                cursor.fetchall()
+            elapsed = (time.perf_counter() - started) / repeat * 1000
+            results[name] = (plan, elapsed)
+    return results
+
+
+def print_results(label, results):
+    print(f'\n== {label} ==')
+    for name, (plan, elapsed) in results.items():
+        print(f'{name:36} {elapsed:9.3f} ms')
+        for line in plan:
+            print(f'    {line}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=2_000_000)
+    parser.add_argument('--titles', type=int, default=2_000)
+    parser.add_argument('--comments', type=int, default=200_000)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    from django.db import connection, transaction
+
+    print(f'Filling {db_path} with {args.reviews} reviews...')
+    started = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        fill_database(cursor, args.reviews, args.titles, args.comments)
+    print(f'Filled in {time.perf_counter() - started:.1f} s')
+
+    params = (args.repeat, args.titles // 2, 50, 7, args.page_size)
+    composite = measure(connection, *params)
+    print_results('composite indexes', composite)
+
+    with connection.cursor() as cursor:
+        for name in COMPOSITE_INDEXES:
+            cursor.execute(f'DROP INDEX {name}')
+        for name, table, column in SINGLE_COLUMN_INDEXES:
+            cursor.execute(f'CREATE INDEX {name} ON {table} ({column})')
+        cursor.execute('ANALYZE')
+    print_results('single-column indexes', measure(connection, *params))
+
+    temp_sorts = [
+        name for name, (plan, _) in composite.items()
+        if any('TEMP B-TREE' in line for line in plan)
+    ]
+    if temp_sorts:
+        print(f'\nTemp B-tree sort is still used by: {", ".join(temp_sorts)}')
+        return 1
+    print('\nAll hot queries are served by index range scans.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Бенчмарк конкурентных чтений и записей SQLite для профилей БД.
+
+Заполняет БД командой generate_dataset и для каждого профиля
+(settings.SQLITE_PROFILES) на копии этой БД запускает потоки-читатели
+(страница отзывов произведения) и потоки-писатели (новый комментарий).
+Профиль default закрывает соединение после каждой операции, как при
+CONN_MAX_AGE=0; production держит его открытым. Выводит число операций
+в секунду, ошибки "database is locked" и p99 задержки.
+
+Пример:
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 4
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+
+class Worker(threading.Thread):
+
+    def __init__(self, operation, deadline, persistent, seed):
+        super().__init__()
+        self.operation = operation
+        self.deadline = deadline
+        self.persistent = persistent
+        self.rng = random.Random(seed)
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        from django.db import OperationalError, connection
+
+        while time.perf_counter() < self.deadline:
+            started = time.perf_counter()
+            try:
+                self.operation(self.rng)
+            except OperationalError:
+                self.errors += 1
+            else:
+                self.latencies.append(time.perf_counter() - started)
+            if not self.persistent:
+                connection.close()
+        connection.close()
+
+
+def p99(latencies):
+    if len(latencies) < 2:
+        return 0.0
+    return statistics.quantiles(latencies, n=100)[98] * 1000
+
+
+def run_profile(profile, db_path, args, operations):
+    from django.conf import settings
+    from django.db import connections
+
+    settings.SQLITE_PRAGMAS = settings.SQLITE_PROFILES[profile]
+    connections.databases['default']['NAME'] = str(db_path)
+    persistent = profile != 'default'
+    deadline = time.perf_counter() + args.duration
+    read, write = operations
+    workers = [
+        Worker(read, deadline, persistent, seed)
+        for seed in range(args.readers)
+    ] + [
+        Worker(write, deadline, persistent, seed)
+        for seed in range(args.readers, args.readers + args.writers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    readers, writers = workers[:args.readers], workers[args.readers:]
+    reads = [lat for worker in readers for lat in worker.latencies]
+    writes = [lat for worker in writers for lat in worker.latencies]
+    errors = sum(worker.errors for worker in workers)
+    print(f'{profile:12} {len(reads) / args.duration:9.0f} '
+          f'{len(writes) / args.duration:9.0f} {errors:7} '
+          f'{p99(reads):9.2f} {p99(writes):9.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--titles', type=int, default=1_000)
+    parser.add_argument('--reviews', type=int, default=50_000)
+    args = parser.parse_args()
+
+    # Исходная БД создаётся без WAL, профиль применяется к её копиям.
+    os.environ['SQLITE_PROFILE'] = 'default'
+    db_path = setup_django()
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    from django.db.models import Max, Min
+
+    from reviews.models import Comment, Review, User
+
+    print(f'Filling {db_path}...')
+    call_command(
+        'generate_dataset', users=5_000, titles=args.titles,
+        reviews=args.reviews, comments=0, stdout=StringIO(),
+    )
+    bounds = Review.objects.aggregate(
+        first=Min('title_id'), last=Max('title_id')
+    )
+    review_ids = list(Review.objects.values_list('id', flat=True))
+    user_ids = list(User.objects.values_list('id', flat=True))
+    connection.close()
+
+    def read(rng):
+        list(
+            Review.objects.filter(
+                title_id=rng.randint(bounds['first'], bounds['last'])
+            ).select_related('author').order_by('-pub_date', '-id')[:10]
+        )
+
+    def write(rng):
+        with transaction.atomic():
+            Comment.objects.create(
+                review_id=rng.choice(review_ids),
+                author_id=rng.choice(user_ids),
+                text='Комментарий',
+            )
+
+    print(f'\n{args.readers} readers, {args.writers} writers, '
+          f'{args.duration:.0f} s per profile\n')
+    print(f'{"profile":12} {"reads/s":>9} {"writes/s":>9} {"errors":>7} '
+          f'{"read p99":>9} {"write p99":>9}')
+    for profile in ('default', 'production'):
+        profile_db = db_path.with_name(f'{profile}.db')
+        shutil.copy(db_path, profile_db)
+        run_profile(profile, profile_db, args, (read, write))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Бенчмарк пакетной загрузки произведений через /api/v1/titles/bulk/.
+
+Загружает произведения пакетами через тестовый клиент Django и считает
+пропускную способность в произведениях в секунду. Для сравнения часть
+произведений загружается по одному через POST /api/v1/titles/.
+
+Пример:
+    python benchmarks/title_bulk.py --titles 20000 --batch-size 1000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+GENRES = 30
+CATEGORIES = 10
+
+
+def make_items(start, count):
+    return [
+        {
+            'name': f'Произведение {idx}',
+            'year': 1900 + idx % 120,
+            'description': f'Описание произведения {idx}',
+            'genre': [f'genre-{idx % GENRES}', f'genre-{idx * 7 % GENRES}'],
+            'category': f'category-{idx % CATEGORIES}',
+        }
+        for idx in range(start, start + count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=20_000)
+    parser.add_argument('--batch-size', type=int, default=1_000)
+    parser.add_argument(
+        '--single', type=int, default=200,
+        help='Titles posted one request each for comparison',
+    )
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import Category, Genre, Title, User
+
+    admin = User.objects.create_user(
+        username='bench-admin', email='bench-admin@yamdb.fake',
+        role=User.ADMIN,
+    )
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'genre {idx}', slug=f'genre-{idx}')
+        for idx in range(GENRES)
+    )
+    Category.objects.bulk_create(
+        Category(name=f'category {idx}', slug=f'category-{idx}')
+        for idx in range(CATEGORIES)
+    )
+    print(f'Database: {db_path}\n')
+
+    started = time.perf_counter()
+    for item in make_items(0, args.single):
+        response = client.post('/api/v1/titles/', data=item, format='json')
+        assert response.status_code == 201, response.content
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for start in range(0, args.titles, args.batch_size):
+        count = min(args.batch_size, args.titles - start)
+        response = client.post(
+            '/api/v1/titles/bulk/', data=make_items(start, count),
+            format='json',
+        )
+        assert response.status_code == 201, response.content
+    bulk = time.perf_counter() - started
+    assert Title.objects.count() == args.single + args.titles
+
+    print(f'{"mode":28} {"titles":>8} {"seconds":>8} {"titles/s":>9}')
+    for mode, titles, elapsed in (
+        ('one per request', args.single, single),
+        (f'bulk, {args.batch_size} per request', args.titles, bulk),
+    ):
+        print(f'{mode:28} {titles:8} {elapsed:8.2f} '
+              f'{titles / elapsed:9.0f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Бенчмарк поиска произведений: FTS5 против icontains.
+
+Заполняет временную БД произведениями со случайными названиями
+и описаниями и сравнивает время страницы выдачи и COUNT(*) для параметра
+``search`` (FTS5) и прежнего фильтра ``name`` (LIKE '%x%').
+
+Пример:
+    python benchmarks/title_search.py --titles 300000
+"""
+import argparse
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.utils import setup_django  # noqa: E402
+
+CHUNK_SIZE = 50_000
+SYLLABLES = (
+    'ка ло ми ра ту не зо ве ри па до ку ше на ги бо ля ту фе мо'
+).split()
+VOCABULARY_SIZE = 20_000
+# Ранги слов словаря для запросов: частое, среднее и редкое.
+QUERY_RANKS = ((5,), (200,), (5000,), (50, 300))
+
+
+def make_vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def fill_titles(cursor, count, vocabulary, rng):
+    """Слова выбираются по закону Ципфа, как в естественном языке."""
+    cum_weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(vocabulary) + 1)
+    ))
+
+    def text(words):
+        return ' '.join(
+            rng.choices(vocabulary, cum_weights=cum_weights, k=words)
+        )
+
+    for start in range(0, count, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, count)
+        cursor.executemany(
+            'INSERT INTO reviews_title (id, name, year, description, '
+            'score_sum, review_count) VALUES (?, ?, 2000, ?, 0, 0)',
+            ((pk, text(3), text(20)) for pk in range(start + 1, stop + 1)),
+        )
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=300_000)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    from django.db import connection, transaction
+
+    from api.filters import TitleFilter
+    from reviews.models import Title
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    print(f'Filling {db_path} with {args.titles} titles...')
+    started = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        fill_titles(cursor, args.titles, vocabulary, rng)
+    print(f'Filled in {time.perf_counter() - started:.1f} s\n')
+
+    queryset = Title.objects.order_by('id')
+    print(f'{"query":24} {"path":10} {"page ms":>9} {"count ms":>9} '
+          f'{"matches":>8}')
+    for ranks in QUERY_RANKS:
+        query = ' '.join(vocabulary[rank] for rank in ranks)
+        for path, params in (
+            ('fts5', {'search': query}),
+            ('icontains', {'name': query}),
+        ):
+            filtered = TitleFilter(params, queryset=queryset).qs
+            page_ms, _ = timed(
+                lambda: list(filtered[:args.page_size]), args.repeat
+            )
+            count_ms, matches = timed(filtered.count, args.repeat)
+            print(f'{query:24} {path:10} {page_ms:9.2f} {count_ms:9.2f} '
+                  f'{matches:8}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Общие помощники для бенчмарков: настройка Django на отдельной БД."""
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = ROOT_DIR / 'api_yamdb'
+
+
+def setup_django(db_path=None):
+    """Поднимает Django с проектными настройками на временной SQLite-БД
+    и применяет миграции. Возвращает путь к файлу БД."""
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp(prefix='yamdb-bench-')) / 'bench.db'
+    settings.DATABASES['default']['NAME'] = str(db_path)
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    # Построчный лог каждого запроса только мешает читать результаты.
+    logging.getLogger('api.timing').setLevel(logging.WARNING)
+    call_command('migrate', verbosity=0)
+    return db_path
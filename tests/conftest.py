@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,26 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # База очищается между тестами без сигналов, поэтому сбрасываем и кэш.
+    from django.core.cache import cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def email_outbox_eager(settings):
+    # Письма из очереди отправляются сразу, без воркера send_emails.
+    settings.EMAIL_OUTBOX_EAGER = True
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    # Файлы метрик процесса пишутся во временный каталог теста.
+    from api.metrics import registry
+    settings.METRICS_DIR = str(tmp_path / 'metrics')
+    registry.reset()
+    yield settings.METRICS_DIR
+    registry.reset()
@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.pagination import PageNumberPagination
+
+from reviews.models import Category, Genre, Title
+
+
+def create_many_titles(count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    titles = [
+        Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        for idx in range(count)
+    ]
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.id, genre_id=genre.id)
+        for title in titles
+        for genre in genres
+    )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    # COUNT(*), страница произведений с категориями, жанры страницы.
+    LIST_QUERIES = 3
+    # Произведение с категорией, жанры произведения.
+    DETAIL_QUERIES = 2
+
+    @pytest.mark.parametrize('page_size', (10, 100))
+    def test_01_title_list_query_count(self, client, monkeypatch,
+                                       django_assert_num_queries, page_size):
+        create_many_titles(page_size)
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert all(len(title['genre']) == 2 for title in results), (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` возвращает '
+            'жанры каждого произведения.'
+        )
+
+    def test_02_title_detail_query_count(self, client,
+                                         django_assert_num_queries):
+        title = create_many_titles(1)[0]
+
+        with django_assert_num_queries(self.DETAIL_QUERIES):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category']['slug'] == 'films'
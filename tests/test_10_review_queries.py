@@ -0,0 +1,175 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.serializers import ReviewSerializer
+from reviews.models import Comment, Review, Title, User
+
+
+def create_authors(django_user_model, count):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ReviewQueries:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    # Родительский объект, COUNT(*), страница с авторами.
+    LIST_QUERIES = 3
+
+    @pytest.mark.parametrize('page_size', (10, 50))
+    def test_01_review_list_query_count(self, client, monkeypatch,
+                                        django_user_model,
+                                        django_assert_num_queries,
+                                        page_size):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        for author in create_authors(django_user_model, page_size):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == page_size
+
+    @pytest.mark.parametrize('page_size', (10, 50))
+    def test_02_comment_list_query_count(self, client, monkeypatch,
+                                         django_user_model,
+                                         django_assert_num_queries,
+                                         page_size):
+        authors = create_authors(django_user_model, page_size)
+        title = Title.objects.create(name='Терминатор', year=1984)
+        review = Review.objects.create(
+            title=title, author=authors[0], text='Отзыв', score=5
+        )
+        for author in authors:
+            Comment.objects.create(
+                review=review, author=author, text='Комментарий'
+            )
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(
+                self.COMMENTS_URL_TEMPLATE.format(
+                    title_id=title.id, review_id=review.id
+                )
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == page_size
+
+    def test_03_review_cursor_pagination(self, client, monkeypatch,
+                                         django_user_model,
+                                         django_assert_num_queries):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+            for author in create_authors(django_user_model, 5)
+        ]
+        # Одинаковые даты проверяют, что порядок задаётся ещё и по id.
+        Review.objects.filter(id__gt=reviews[1].id).update(
+            pub_date=reviews[1].pub_date
+        )
+        expected_ids = list(
+            Review.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 2)
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url, {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора не выполняется подсчёт отзывов.'
+        )
+        received_ids = [review['id'] for review in data['results']]
+        while data['next']:
+            # Произведение и страница отзывов, без COUNT(*).
+            with django_assert_num_queries(2):
+                response = client.get(data['next'])
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            received_ids.extend(review['id'] for review in data['results'])
+        assert received_ids == expected_ids, (
+            'Проверьте, что курсор обходит отзывы по `(pub_date, id)` '
+            'без пропусков и повторов.'
+        )
+
+        response = client.get(url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_nested_route_resolution(self, django_user_model,
+                                        django_assert_num_queries):
+        author, = create_authors(django_user_model, 1)
+        title, other_title = (
+            Title.objects.create(name=name, year=1984)
+            for name in ('Терминатор', 'Чужой')
+        )
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}'
+        )
+
+        response = client.get(self.COMMENTS_URL_TEMPLATE.format(
+            title_id=other_title.id, review_id=review.id
+        ))
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии доступны только по адресу '
+            'произведения, к которому относится отзыв.'
+        )
+
+        # Пользователь, отзыв вместе с произведением, вставка комментария.
+        with django_assert_num_queries(3):
+            response = client.post(
+                self.COMMENTS_URL_TEMPLATE.format(
+                    title_id=title.id, review_id=review.id
+                ),
+                data={'text': 'Комментарий'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_05_review_integrity_errors(self, django_user_model):
+        author, = create_authors(django_user_model, 1)
+        title = Title.objects.create(name='Терминатор', year=1984)
+        data = {'title': title, 'author': author, 'text': 'Отзыв', 'score': 5}
+        ReviewSerializer().create(dict(data))
+        with pytest.raises(ValidationError):
+            ReviewSerializer().create(dict(data))
+        with pytest.raises(IntegrityError):
+            ReviewSerializer().create({**data, 'author': User(pk=10 ** 6)})
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}'
+        )
+        response = client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            data={'text': 'Ещё отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert list(response.json()) == ['non_field_errors'], (
+            'Проверьте, что ошибка повторного отзыва приходит в поле '
+            '`non_field_errors`.'
+        )
@@ -0,0 +1,213 @@
+import time
+from http import HTTPStatus
+
+import pytest
+
+from api.cache import (
+    TitleListCacheMixin, get_cache, get_version, title_version_prefix,
+    version_key, version_timeout,
+)
+from reviews.models import Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    @pytest.mark.parametrize('url', ('/api/v1/categories/', '/api/v1/genres/'))
+    def test_01_list_is_cached_until_write(self, client, admin_client,
+                                           django_assert_num_queries, url):
+        admin_client.post(url, data={'name': 'Первый', 'slug': 'first'})
+        response = client.get(url, {'search': 'Пер'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+
+        with django_assert_num_queries(0):
+            cached = client.get(url, {'search': 'Пер'})
+        assert cached.json() == response.json(), (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из кэша.'
+        )
+
+        admin_client.post(url, data={'name': 'Первый бис', 'slug': 'bis'})
+        response = client.get(url, {'search': 'Пер'})
+        assert response.json()['count'] == 2, (
+            f'Проверьте, что после POST-запроса к `{url}` кэш списка '
+            'сбрасывается.'
+        )
+
+        admin_client.delete(f'{url}bis/')
+        response = client.get(url, {'search': 'Пер'})
+        assert response.json()['count'] == 1, (
+            f'Проверьте, что после DELETE-запроса к `{url}` кэш списка '
+            'сбрасывается.'
+        )
+
+    def test_02_title_list_targeted_invalidation(self, client, admin_client,
+                                                 user_client,
+                                                 django_assert_num_queries):
+        titles, categories, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        first_page = {'category': categories[0]['slug']}
+        second_page = {'category': categories[1]['slug']}
+        client.get(url, first_page)
+        client.get(url, second_page)
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+
+        with django_assert_num_queries(0):
+            response = client.get(url, second_page)
+        assert response.json()['results'][0]['id'] == titles[1]['id'], (
+            'Проверьте, что отзыв не сбрасывает кэш страниц, на которых '
+            'нет его произведения.'
+        )
+        response = client.get(url, first_page)
+        assert response.json()['results'][0]['rating'] == 8, (
+            'Проверьте, что отзыв сбрасывает кэш страниц, на которых есть '
+            'его произведение.'
+        )
+
+        admin_client.patch(
+            f'{url}{titles[1]["id"]}/',
+            data={'category': categories[0]['slug']}
+        )
+        response = client.get(url, first_page)
+        assert response.json()['count'] == 2, (
+            'Проверьте, что изменение произведения сбрасывает кэш списков.'
+        )
+
+    def test_03_conditional_get(self, client, admin_client, user_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+        )
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+            )
+            assert response.has_header('Last-Modified')
+            etags[url] = response['ETag']
+
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                'If-None-Match возвращает 304 без запросов к БД.'
+            )
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 8)
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после нового отзыва ETag `{url}` меняется.'
+            )
+            assert response['ETag'] != etags[url]
+
+    def test_04_write_during_page_build(self, client, admin_client, user,
+                                        monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        get_title_prefixes = TitleListCacheMixin.get_title_prefixes
+
+        def review_after_query(view, data):
+            # Отзыв фиксируется, когда страница уже выбрана из БД.
+            Review.objects.create(
+                title_id=titles[0]['id'], author=user, text='Отзыв', score=8
+            )
+            monkeypatch.setattr(
+                TitleListCacheMixin, 'get_title_prefixes', get_title_prefixes
+            )
+            return get_title_prefixes(view, data)
+
+        monkeypatch.setattr(
+            TitleListCacheMixin, 'get_title_prefixes', review_after_query
+        )
+        response = client.get(url)
+        assert response.json()['results'][0]['rating'] is None
+        response = client.get(url)
+        assert response.json()['results'][0]['rating'] == 8, (
+            'Проверьте, что страница, выбранная до отзыва, не кэшируется '
+            'под версией, поднятой этим отзывом.'
+        )
+
+    def test_05_object_version_timeout(self, client, admin_client,
+                                       settings, monkeypatch):
+        assert version_timeout('titles') is None
+        for prefix in (title_version_prefix(1), 'reviews:1', 'comments:1'):
+            assert version_timeout(prefix) == settings.API_CACHE_TIMEOUT, (
+                'Проверьте, что версии отдельных объектов не бессрочны.'
+            )
+
+        titles, _, _ = create_titles(admin_client)
+        cache = get_cache()
+        timeouts = {}
+        set_many = cache.set_many
+
+        def spy(data, timeout=None, **kwargs):
+            timeouts.update(dict.fromkeys(data, timeout))
+            return set_many(data, timeout, **kwargs)
+
+        monkeypatch.setattr(cache, 'set_many', spy)
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert timeouts[version_key(f'reviews:{titles[0]["id"]}')] == (
+            settings.API_CACHE_TIMEOUT
+        ), 'Проверьте, что версия отзывов произведения хранится с TTL.'
+
+    def test_06_etag_depends_on_request(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etags = {
+            client.get(url)['ETag'],
+            client.get(url, {'fields': 'name'})['ETag'],
+            client.get(url, HTTP_ACCEPT='text/html')['ETag'],
+        }
+        assert len(etags) == 3, (
+            'Проверьте, что ETag зависит от адреса с параметрами и от '
+            'формата ответа.'
+        )
+
+    def test_07_last_modified_same_second(self, client, admin_client,
+                                          monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        second = int(time.time()) + 100
+        clock = {'now': second * 1000 + 200}
+        monkeypatch.setattr('api.cache.now_version', lambda: clock['now'])
+        monkeypatch.setattr(
+            'api.conditional.now_version', lambda: clock['now']
+        )
+
+        admin_client.patch(url, data={'name': 'Первое'})
+        last_modified = client.get(url)['Last-Modified']
+        clock['now'] += 500
+        admin_client.patch(url, data={'name': 'Второе'})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение в ту же секунду не даёт ответ 304 '
+            'по If-Modified-Since.'
+        )
+
+        clock['now'] += 1000
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_08_users_version(self, user):
+        version = get_version('users')
+        user.first_name = 'Имя'
+        user.save()
+        assert get_version('users') == version, (
+            'Проверьте, что изменение полей пользователя, кроме username, '
+            'не сбрасывает кэш отзывов и комментариев.'
+        )
+        user.username = 'renamed'
+        user.save()
+        assert get_version('users') != version, (
+            'Проверьте, что смена username сбрасывает кэш отзывов '
+            'и комментариев.'
+        )
@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+
+        assert self.search(client, search='Терминат') == [titles[0]['name']], (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'ищет произведения по началу слова в названии.'
+        )
+        assert self.search(client, search='yippie') == [titles[1]['name']], (
+            f'Проверьте, что параметр `search` эндпоинта `{self.TITLES_URL}` '
+            'ищет произведения по описанию.'
+        )
+        assert self.search(
+            client, search='орешек', genre=genres[0]['slug']
+        ) == [], (
+            'Проверьте, что поиск сочетается с фильтрами по жанру, категории '
+            'и году.'
+        )
+        assert self.search(client, search='"*)(') == [
+            titles[0]['name'], titles[1]['name']
+        ]
+
+    def test_02_search_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+
+        admin_client.patch(title_url, data={'name': 'Хищник'})
+        assert self.search(client, search='хищник') == ['Хищник']
+        assert self.search(client, search='терминатор') == []
+
+        admin_client.delete(title_url)
+        assert self.search(client, search='хищник') == [], (
+            'Проверьте, что удалённое произведение пропадает из поиска.'
+        )
+
+    def test_03_search_ranks_name_matches_first(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/',
+            data={'description': 'Не крепкий, но орешек'}
+        )
+        assert self.search(client, search='орешек') == [
+            titles[1]['name'], titles[0]['name']
+        ], (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
@@ -0,0 +1,55 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Sum
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13GenerateDataset:
+
+    def generate(self, seed):
+        call_command(
+            'generate_dataset', users=50, titles=20, genres=5, categories=3,
+            reviews=300, comments=100, seed=seed, stdout=StringIO()
+        )
+
+    def test_01_generated_dataset(self):
+        self.generate(seed=1)
+
+        assert User.objects.count() == 50
+        assert Title.objects.count() == 20
+        assert Comment.objects.count() == 100
+        counts = list(
+            Review.objects.values('title').annotate(total=Count('id'))
+            .order_by('-total').values_list('total', flat=True)
+        )
+        assert counts[0] > counts[-1], (
+            'Проверьте, что отзывы распределены по произведениям неравномерно.'
+        )
+        totals = Title.objects.aggregate(
+            score_sum=Sum('score_sum'), review_count=Sum('review_count')
+        )
+        assert totals['review_count'] == Review.objects.count()
+        assert totals['score_sum'] == Review.objects.aggregate(
+            total=Sum('score')
+        )['total'], 'Проверьте, что рейтинги пересчитаны после генерации.'
+
+    def test_02_generation_is_reproducible(self):
+        self.generate(seed=7)
+        first = list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score'
+        ))
+        Title.objects.all().delete()
+        User.objects.all().delete()
+
+        self.generate(seed=7)
+        second = list(Review.objects.order_by('id').values_list(
+            'title_id', 'author_id', 'score'
+        ))
+        assert first == second, (
+            'Проверьте, что с одним и тем же seed генерируются одинаковые '
+            'данные.'
+        )
@@ -0,0 +1,50 @@
+import json
+import logging
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.fixture(autouse=True)
+def sample_all_requests(settings):
+    settings.REQUEST_TIMING_SAMPLE_RATE = 1.0
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14RequestTiming:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_server_timing_header_and_log(self, client, admin_client,
+                                             caplog):
+        create_titles(admin_client)
+        logger = logging.getLogger('api.timing')
+        logger.addHandler(caplog.handler)
+        try:
+            with caplog.at_level(logging.INFO, logger='api.timing'):
+                response = client.get(self.TITLES_URL)
+        finally:
+            logger.removeHandler(caplog.handler)
+
+        header = response.get('Server-Timing', '')
+        for metric in ('db;', 'view;', 'serialize;', 'render;', 'total;'):
+            assert metric in header, (
+                'Проверьте, что ответ содержит метрику '
+                f'`{metric[:-1]}` в заголовке Server-Timing.'
+            )
+        assert 'desc="3 queries"' in header
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['route'] == 'title-list'
+        assert record['status'] == 200
+        assert record['queries'] == 3
+        assert record['serialize_ms'] > 0, (
+            'Проверьте, что сериализация объектов замеряется отдельно '
+            'от view.'
+        )
+
+    def test_02_sampling_off(self, client, settings):
+        settings.REQUEST_TIMING_SAMPLE_RATE = 0
+        response = client.get(self.TITLES_URL)
+        assert 'Server-Timing' not in response
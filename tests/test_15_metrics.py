@@ -0,0 +1,59 @@
+import re
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+
+from api.metrics import INITIAL_SIZE, registry
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Metrics:
+
+    METRICS_URL = '/metrics'
+
+    def test_01_metrics_endpoint(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        client.get('/api/v1/titles/999999/')
+
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+
+        assert re.search(
+            r'^api_requests_total\{action="list",method="GET",'
+            r'route="title",status="200"\} 2\.0$', text, re.MULTILINE
+        ), 'Проверьте, что /metrics считает запросы по маршруту и action.'
+        assert 'route="title",status="404"' in text
+        assert re.search(
+            r'^api_request_duration_seconds_bucket\{action="list",'
+            r'route="title",le="\+Inf"\} 2\.0$', text, re.MULTILINE
+        ), 'Проверьте, что /metrics отдаёт гистограмму задержек.'
+        assert re.search(
+            r'^api_db_queries_total\{action="list",route="reviews"\} '
+            r'[1-9]\d*\.0$',
+            text, re.MULTILINE
+        ), 'Проверьте, что /metrics считает SQL-запросы маршрута.'
+        assert re.search(
+            r'^api_cache_requests_total\{cache="titles",result="hit"\} 1\.0$',
+            text, re.MULTILINE
+        ), 'Проверьте, что /metrics считает попадания в кэш ответов.'
+
+    def test_02_file_grows(self, metrics_dir):
+        keys = [f'{"x" * 100}{number}' for number in range(1000)]
+        for key in keys:
+            registry.inc('api_requests_total', {'key': key})
+        registry.inc('api_requests_total', {'key': keys[0]})
+        paths = list(Path(metrics_dir).glob('*.db'))
+        assert len(paths) == 1
+        assert paths[0].stat().st_size > INITIAL_SIZE
+        totals = registry.collect()
+        assert len(totals) == len(keys)
+        assert sum(totals.values()) == len(keys) + 1, (
+            'Проверьте, что значения сохраняются при росте файла метрик.'
+        )
@@ -0,0 +1,77 @@
+import json
+import logging
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SlowQueries:
+
+    def test_01_slow_query_log(self, client, admin_client, settings,
+                               caplog):
+        titles, _, _ = create_titles(admin_client)
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        logger = logging.getLogger('api.slow_queries')
+        logger.addHandler(caplog.handler)
+        try:
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        finally:
+            logger.removeHandler(caplog.handler)
+
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.slow_queries'
+        ]
+        assert records, (
+            'Проверьте, что запросы дольше SLOW_QUERY_THRESHOLD_MS '
+            'пишутся в лог api.slow_queries.'
+        )
+        review_query = next(
+            record for record in records
+            if 'FROM "reviews_review"' in record['sql']
+        )
+        assert review_query['view'] == 'reviews-list'
+        assert review_query['action'] == 'list'
+        assert review_query['call_site'].startswith('api/'), (
+            'Проверьте, что в записи есть место в коде проекта, '
+            'откуда выполнен запрос.'
+        )
+        assert review_query['plan'], (
+            'Проверьте, что в записи есть план запроса.'
+        )
+        assert all(
+            not record['sql'].startswith('EXPLAIN') for record in records
+        )
+
+    def test_02_write_params_are_not_logged(self, admin_client, settings,
+                                            caplog):
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        logger = logging.getLogger('api.slow_queries')
+        logger.addHandler(caplog.handler)
+        try:
+            response = admin_client.post('/api/v1/users/', data={
+                'username': 'secret-user', 'email': 'secret@yamdb.fake',
+            })
+        finally:
+            logger.removeHandler(caplog.handler)
+        assert response.status_code == 201
+
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api.slow_queries'
+        ]
+        insert = next(
+            record for record in records
+            if record['sql'].startswith('INSERT INTO "users_user"')
+        )
+        assert insert['params'] is None and insert['plan'] is None, (
+            'Проверьте, что параметры и план запросов на запись '
+            'не пишутся в лог.'
+        )
+        assert all(
+            'secret@yamdb.fake' not in (record['params'] or [])
+            for record in records
+            if not record['sql'].lstrip().upper().startswith('SELECT')
+        )
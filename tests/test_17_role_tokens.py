@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.models import User
+
+
+def get_role_client(user):
+    client = APIClient()
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == HTTPStatus.OK
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["token"]}')
+    return client
+
+
+@pytest.fixture
+def expired_token_versions(settings):
+    # Версия токенов не задерживается в кэше, как после истечения
+    # TOKEN_VERSION_CACHE_TIMEOUT.
+    settings.TOKEN_VERSION_CACHE_TIMEOUT = 0
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17RoleTokens:
+
+    URL = '/api/v1/categories/'
+
+    def test_01_no_user_query(self, admin):
+        client = get_role_client(admin)
+        client.post(self.URL, data={'name': 'Фильм', 'slug': 'films'})
+        with CaptureQueriesContext(connection) as context:
+            response = client.delete(f'{self.URL}films/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not [
+            query for query in context.captured_queries
+            if 'FROM "users_user"' in query['sql']
+        ], (
+            'Проверьте, что права администратора проверяются по токену, '
+            'без загрузки пользователя из БД.'
+        )
+
+    def test_02_role_change_revokes_token(self, admin):
+        client = get_role_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        admin.role = 'user'
+        admin.save()
+        assert client.get(
+            '/api/v1/users/'
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли прежний токен не принимается.'
+        )
+
+        admin.bio = 'new bio'
+        admin.save()
+        client = get_role_client(admin)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_03_deleted_user_token(self, admin, user):
+        client = get_role_client(user)
+        user.delete()
+        assert client.get(
+            '/api/v1/users/me/'
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+    def test_04_bulk_update_after_cache_timeout(self, expired_token_versions,
+                                                admin):
+        client = get_role_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        User.objects.filter(pk=admin.pk).update(
+            role=User.USER, token_version=F('token_version') + 1
+        )
+        assert client.get(
+            '/api/v1/users/'
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что версия токенов в кэше истекает через '
+            'TOKEN_VERSION_CACHE_TIMEOUT и перечитывается из БД.'
+        )
+
+    @pytest.mark.parametrize('field, value', (
+        ('role', User.USER), ('is_active', False),
+    ))
+    def test_05_update_fields_revokes_token(self, expired_token_versions,
+                                            admin, field, value):
+        client = get_role_client(admin)
+        setattr(admin, field, value)
+        admin.save(update_fields=[field])
+        assert User.objects.get(pk=admin.pk).token_version == 1, (
+            'Проверьте, что при save(update_fields=...) новая версия '
+            'токенов записывается в БД.'
+        )
+        assert client.get(
+            '/api/v1/users/'
+        ).status_code == HTTPStatus.UNAUTHORIZED
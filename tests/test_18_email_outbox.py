@@ -0,0 +1,81 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues_email(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что регистрация не отправляет письмо в запросе.'
+        )
+        message = OutboxEmail.objects.get()
+        assert message.recipient == 'valid@yamdb.fake'
+
+        call_command('send_emails', '--once', stdout=StringIO())
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['valid@yamdb.fake']
+        message.refresh_from_db()
+        assert message.sent_at is not None
+
+        call_command('send_emails', '--once', stdout=StringIO())
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_18_email_outbox.BrokenBackend'
+        settings.EMAIL_OUTBOX_BACKOFF = 30
+        message = OutboxEmail.objects.create(
+            subject='Тема', body='Текст', from_email='Yamdb',
+            recipient='valid@yamdb.fake',
+        )
+
+        started = timezone.now()
+        call_command('send_emails', '--once', stdout=StringIO())
+        message.refresh_from_db()
+        assert message.sent_at is None
+        assert message.attempts == 1
+        assert 'ConnectionRefusedError' in message.last_error
+        assert message.next_attempt_at >= started + timedelta(seconds=30)
+
+        # До следующей попытки письмо не забирается.
+        call_command('send_emails', '--once', stdout=StringIO())
+        message.refresh_from_db()
+        assert message.attempts == 1
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend'
+        )
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_emails', '--once', stdout=StringIO())
+        message.refresh_from_db()
+        assert message.sent_at is not None
+        assert len(mail.outbox) == 1
+
+
+class BrokenBackend:
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP server is down')
+
+    def close(self):
+        pass
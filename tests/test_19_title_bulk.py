@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.bulk import TitleBulkWriter
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleBulk:
+
+    URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, admin_client, user_client,
+                            django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = [
+            {'name': f'Произведение {idx}', 'year': 2000 + idx % 20,
+             'genre': [genres[idx % 2]['slug'], genres[2]['slug']],
+             'category': categories[idx % 2]['slug']}
+            for idx in range(50)
+        ]
+        items.insert(10, {'name': 'Без жанра', 'year': 2000,
+                          'genre': ['unknown'],
+                          'category': categories[0]['slug']})
+        items.insert(20, {'name': 'Из будущего', 'year': 3000,
+                          'genre': [genres[0]['slug']],
+                          'category': categories[0]['slug']})
+
+        response = user_client.post(self.URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        # Проверка данных, жанры, категории, вставки, транзакция.
+        with django_assert_max_num_queries(10):
+            response = admin_client.post(self.URL, data=items, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()['results']
+        assert [result['status'] for result in results].count(
+            'created'
+        ) == 50
+        assert results[10]['status'] == 'error'
+        assert 'genre' in results[10]['errors']
+        assert 'year' in results[20]['errors']
+
+        for item, result in zip(items, results):
+            if result['status'] != 'created':
+                continue
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == item['name'], (
+                'Проверьте, что в ответе id созданного произведения '
+                'соответствует элементу запроса.'
+            )
+            assert sorted(
+                title.genre.values_list('slug', flat=True)
+            ) == sorted(item['genre'])
+            assert title.category.slug == item['category']
+
+        response = admin_client.get('/api/v1/titles/')
+        assert response.json()['count'] == 50
+
+    def test_02_bulk_update(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        response = admin_client.post(self.URL, data=[
+            {'name': f'Произведение {idx}', 'year': 2000,
+             'genre': [genres[0]['slug']], 'category': categories[0]['slug']}
+            for idx in range(3)
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        ids = [result['id'] for result in response.json()['results']]
+
+        response = admin_client.patch(self.URL, data=[
+            {'id': ids[0], 'name': 'Новое название'},
+            {'id': ids[1], 'genre': [genres[1]['slug'], genres[2]['slug']]},
+            {'id': 999999, 'name': 'Нет такого'},
+            {'name': 'Без id'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        statuses = [r['status'] for r in response.json()['results']]
+        assert statuses == ['updated', 'updated', 'error', 'error']
+
+        first = admin_client.get(f'/api/v1/titles/{ids[0]}/').json()
+        assert first['name'] == 'Новое название'
+        assert first['year'] == 2000
+        second = Title.objects.get(pk=ids[1])
+        assert sorted(second.genre.values_list('slug', flat=True)) == sorted(
+            [genres[1]['slug'], genres[2]['slug']]
+        )
+
+        response = admin_client.post(self.URL, data={'name': 'x'},
+                                     format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_create_without_returning(self, admin_client, monkeypatch):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = [
+            {'name': f'Произведение {idx}', 'year': 2000,
+             'genre': [genres[idx % 2]['slug']],
+             'category': categories[0]['slug']}
+            for idx in range(5)
+        ]
+        # БД без RETURNING и не SQLite: ключи нельзя восстановить по
+        # порядку, произведения вставляются по одному.
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        writer = TitleBulkWriter(items)
+        writer.validate()
+        results = writer.save()
+        monkeypatch.undo()
+
+        for item, result in zip(items, results):
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == item['name'], (
+                'Проверьте, что без RETURNING id созданных произведений '
+                'не восстанавливаются по порядку ключей.'
+            )
+            assert list(
+                title.genre.values_list('slug', flat=True)
+            ) == item['genre']
+
+    def test_04_bulk_update_duplicate_ids(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        response = admin_client.post(self.URL, data=[
+            {'name': f'Произведение {idx}', 'year': 2000,
+             'genre': [genres[0]['slug']], 'category': categories[0]['slug']}
+            for idx in range(2)
+        ], format='json')
+        ids = [result['id'] for result in response.json()['results']]
+
+        response = admin_client.patch(self.URL, data=[
+            {'id': ids[0], 'genre': [genres[1]['slug']]},
+            {'id': ids[1], 'name': 'Новое название'},
+            {'id': ids[0], 'genre': [genres[1]['slug']]},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()['results']
+        assert [result['status'] for result in results] == [
+            'error', 'updated', 'error'
+        ], (
+            'Проверьте, что повторяющийся id в пакете отклоняется '
+            'ошибкой элемента, а не ошибкой сервера.'
+        )
+        assert 'id' in results[0]['errors']
+        assert list(Title.objects.get(pk=ids[0]).genre.values_list(
+            'slug', flat=True
+        )) == [genres[0]['slug']]
+        assert Title.objects.get(pk=ids[1]).name == 'Новое название'
@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection, connections
+
+
+@pytest.mark.django_db
+class Test20SqliteProfile:
+
+    def test_01_pragmas_applied(self, settings):
+        assert settings.DATABASES['default']['CONN_MAX_AGE'] > 0, (
+            'Проверьте, что соединения с БД переиспользуются.'
+        )
+        if connection.vendor != 'sqlite':
+            pytest.skip('PRAGMA есть только у SQLite')
+        settings.SQLITE_PRAGMAS = {
+            'synchronous': 'off',
+            'busy_timeout': 1234,
+            'cache_size': -4096,
+        }
+        # Новое соединение: PRAGMA выполняются при подключении.
+        new_connection = connections.create_connection('default')
+        try:
+            with new_connection.cursor() as cursor:
+                for name, expected in (
+                    ('synchronous', 0),
+                    ('busy_timeout', 1234),
+                    ('cache_size', -4096),
+                ):
+                    cursor.execute(f'PRAGMA {name}')
+                    value, = cursor.fetchone()
+                    assert value == expected, (
+                        f'Проверьте, что при подключении к SQLite '
+                        f'выполняется PRAGMA {name} из SQLITE_PRAGMAS.'
+                    )
+        finally:
+            new_connection.close()
@@ -0,0 +1,61 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api.middleware import ReplicaRoutingMiddleware
+from api.routers import ReplicaRouter, replica
+from api.views import TitleViewSet, sign_up
+from reviews.models import Title
+
+
+class Test21ReadReplicas:
+
+    def test_01_routing_and_stickiness(self, settings):
+        settings.DATABASE_REPLICAS = ['replica_0']
+        routed = []
+
+        def get_response(request):
+            middleware.process_view(request, request.view, (), {})
+            routed.append(ReplicaRouter().db_for_read(Title))
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        factory = RequestFactory()
+
+        def call(method, token, view=TitleViewSet.as_view({'get': 'list'})):
+            request = getattr(factory, method)(
+                '/api/v1/titles/', HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+            request.view = view
+            middleware(request)
+            return routed[-1]
+
+        assert call('get', 'first') == 'replica_0', (
+            'Проверьте, что безопасные запросы к вьюсетам api читают '
+            'из реплики.'
+        )
+        assert replica.get() is None
+        assert call('get', 'first', view=sign_up) is None
+        assert call('post', 'first') is None
+        assert call('get', 'first') is None, (
+            'Проверьте, что после записи клиент читает из default.'
+        )
+        assert call('get', 'second') == 'replica_0'
+        assert ReplicaRouter().db_for_write(Title) == 'default'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_refresh_replicas(self, tmp_path):
+        Title.objects.create(name='Терминатор', year=1984)
+        path = tmp_path / 'replica.db'
+        call_command('refresh_replicas', str(path), stdout=StringIO())
+        with sqlite3.connect(path) as replica_db:
+            names = replica_db.execute(
+                'SELECT name FROM reviews_title'
+            ).fetchall()
+        assert names == [('Терминатор',)], (
+            'Проверьте, что refresh_replicas копирует default в реплику.'
+        )
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_title_fields(self, client, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, {'fields': 'id,name'})
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert results and all(
+            set(item) == {'id', 'name'} for item in results
+        ), 'Проверьте, что ?fields= оставляет в ответе только эти поля.'
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что без поля genre жанры не загружаются.'
+        )
+        assert 'JOIN' not in sql
+        assert '"description"' not in sql, (
+            'Проверьте, что ненужные колонки не загружаются.'
+        )
+
+        response = client.get(self.TITLES_URL, {'fields': 'name,rating'})
+        assert all(
+            set(item) == {'name', 'rating'}
+            for item in response.json()['results']
+        )
+        response = client.get(self.TITLES_URL, {'fields': 'category'})
+        assert response.json()['results'][0]['category']['slug']
+
+        response = client.get(self.TITLES_URL, {'fields': 'id,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_review_and_category_fields(self, client, admin_client,
+                                           admin):
+        titles, categories, _ = create_titles(admin_client)
+        Review.objects.create(
+            title_id=titles[0]['id'], author=admin, text='Отзыв', score=5
+        )
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'fields': 'id,score'})
+        assert response.json()['results'] == [
+            {'id': response.json()['results'][0]['id'], 'score': 5}
+        ]
+        assert not any(
+            'users_user' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что без поля author авторы не загружаются.'
+
+        response = client.get(url, {'fields': 'author'})
+        assert response.json()['results'] == [{'author': admin.username}]
+
+        response = client.get('/api/v1/categories/', {'fields': 'slug'})
+        assert sorted(
+            response.json()['results'], key=lambda item: item['slug']
+        ) == sorted(
+            ({'slug': category['slug']} for category in categories),
+            key=lambda item: item['slug']
+        )
@@ -0,0 +1,111 @@
+import datetime
+import decimal
+import json
+import uuid
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from tests.utils import create_single_review, create_titles
+
+pytest.importorskip('orjson')
+
+
+def render_both(data, accepted_media_type=None):
+    return (
+        FastJSONRenderer().render(data, accepted_media_type),
+        JSONRenderer().render(data, accepted_media_type),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23JSONRenderer:
+
+    def test_01_endpoints_byte_identical(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        text = 'Отзыв 🎬 с «кавычками», \\ и\u2028разрывом\u2029строк'
+        create_single_review(user_client, titles[0]['id'], text, 7)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            '/api/v1/categories/',
+            '/api/v1/users/',
+        )
+        for url in urls:
+            response = admin_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert isinstance(
+                response.accepted_renderer, FastJSONRenderer
+            ), 'Проверьте, что FastJSONRenderer включён в настройках.'
+            assert response.content == JSONRenderer().render(
+                response.data
+            ), (
+                f'Проверьте, что ответ `{url}` совпадает с выводом '
+                'JSONRenderer байт в байт.'
+            )
+        content = admin_client.get(urls[2]).content
+        assert b'\\u2028' in content and b'\xe2\x80\xa8' not in content, (
+            'Проверьте, что U+2028 экранируется, как в JSONRenderer.'
+        )
+
+    def test_02_types_byte_identical(self):
+        data = {
+            'date': datetime.date(2024, 2, 29),
+            'datetime': datetime.datetime(
+                2024, 2, 29, 12, 30, 5, 123456,
+                tzinfo=datetime.timezone.utc,
+            ),
+            'time': datetime.time(12, 30),
+            'duration': datetime.timedelta(hours=1),
+            'decimal': decimal.Decimal('1.50'),
+            'uuid': uuid.UUID(int=1),
+            'float': 0.1,
+            'big': 2 ** 70,
+            'nested': [{'a': None, 'b': True}, (1, 2)],
+            1: 'ключ не строка',
+        }
+        fast, reference = render_both(data)
+        assert fast == reference, (
+            'Проверьте, что типы кодируются так же, как в JSONRenderer.'
+        )
+        fast, reference = render_both({'exponent': [1e16, 1.5e-7, 1e-300]})
+        assert json.loads(fast) == json.loads(reference), (
+            'Проверьте, что float с порядком кодируются без потерь.'
+        )
+        assert render_both(None) == (b'', b'')
+        fast, reference = render_both(
+            {'a': [1]}, 'application/json; indent=4'
+        )
+        assert fast == reference, 'Проверьте поддержку отступа.'
+
+    def test_03_parser(self, admin_client):
+        client = APIClient()
+        response = client.post(
+            '/api/v1/auth/signup/', data=b'{"username": ', content_type=(
+                'application/json'
+            )
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'JSON parse error' in response.json()['detail'], (
+            'Проверьте, что на некорректный JSON возвращается ParseError.'
+        )
+
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data='{"name": "Кино 🎬", "slug": "kino"}'.encode(),
+            content_type='application/json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['name'] == 'Кино 🎬'
+
+    def test_04_parser_fallback(self):
+        body = b'{"big": 123456789012345678901234567890}'
+        assert FastJSONParser().parse(BytesIO(body)) == {
+            'big': 123456789012345678901234567890
+        }, 'Проверьте, что JSON, который не разбирает orjson, разбирает json.'
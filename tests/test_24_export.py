@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+from tests.utils import create_comments, create_titles
+
+
+def read_lines(response):
+    assert response.streaming, 'Проверьте, что выгрузка отдаётся потоком.'
+    content = b''.join(response.streaming_content)
+    assert content.endswith(b'\n')
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Export:
+
+    URL_TEMPLATE = '/api/v1/export/{}/'
+
+    def test_01_admin_only(self, client, user_client, moderator_client):
+        for resource in ('titles', 'reviews', 'comments'):
+            url = self.URL_TEMPLATE.format(resource)
+            assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+            for role_client in (user_client, moderator_client):
+                assert role_client.get(url).status_code == (
+                    HTTPStatus.FORBIDDEN
+                ), f'Проверьте, что `{url}` доступен только администратору.'
+
+    def test_02_titles(self, admin_client, monkeypatch):
+        monkeypatch.setattr('api.export.CHUNK_SIZE', 2)
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.get(self.URL_TEMPLATE.format('titles'))
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        expected = sorted(
+            admin_client.get('/api/v1/titles/').json()['results'],
+            key=lambda title: title['id'],
+        )
+        assert read_lines(response) == expected, (
+            'Проверьте, что выгрузка произведений совпадает с их '
+            'представлением в API.'
+        )
+        response = admin_client.get(
+            self.URL_TEMPLATE.format('titles'), {'since': '2020-01-01'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_reviews_and_comments(self, admin_client, user, user_client,
+                                     moderator, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(self.URL_TEMPLATE.format('reviews'))
+            lines = read_lines(response)
+        assert len([
+            query for query in context.captured_queries
+            if 'reviews_review' in query['sql']
+        ]) == 1, 'Проверьте, что отзывы выгружаются одним запросом.'
+        api = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        ).json()['results']
+        assert lines == sorted(api, key=lambda review: review['id']), (
+            'Проверьте, что выгрузка отзывов совпадает с их '
+            'представлением в API.'
+        )
+
+        lines = read_lines(
+            admin_client.get(self.URL_TEMPLATE.format('comments'))
+        )
+        assert [line['id'] for line in lines] == [
+            comment['id'] for comment in comments
+        ]
+        assert {line['review'] for line in lines} == {reviews[0]['id']}
+        assert {line['title'] for line in lines} == {titles[0]['id']}
+        assert lines[0]['author'] == user.username
+
+    def test_04_since(self, admin_client, user, user_client, moderator,
+                      moderator_client):
+        comments, reviews, _ = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        Review.objects.filter(pk=reviews[-1]['id']).update(pub_date=old)
+        Comment.objects.filter(pk=comments[-1]['id']).update(pub_date=old)
+        since = (old + timedelta(days=1)).isoformat()
+        for resource, objects in (
+            ('reviews', reviews), ('comments', comments)
+        ):
+            url = self.URL_TEMPLATE.format(resource)
+            lines = read_lines(admin_client.get(url))
+            assert lines[0]['id'] == objects[-1]['id'], (
+                'Проверьте, что выгрузка упорядочена по pub_date.'
+            )
+            lines = read_lines(admin_client.get(url, {'since': since}))
+            assert [line['id'] for line in lines] == [
+                obj['id'] for obj in objects[:-1]
+            ], 'Проверьте, что ?since= фильтрует объекты по pub_date.'
+
+        response = admin_client.get(
+            self.URL_TEMPLATE.format('reviews'), {'since': 'вчера'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'since' in json.loads(response.content)
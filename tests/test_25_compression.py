@@ -0,0 +1,197 @@
+import gzip
+import json
+import os
+from http import HTTPStatus
+
+import brotli
+import pytest
+from django.conf import settings as django_settings
+
+from api import compression
+from api.compression import parse_accept_encoding
+from tests.utils import create_comments, create_titles
+
+
+@pytest.fixture
+def count_compress(monkeypatch):
+    calls = []
+    compress = compression.compress
+
+    def counted(content, encoding):
+        calls.append(encoding)
+        return compress(content, encoding)
+
+    monkeypatch.setattr('api.middleware.compress', counted)
+    return calls
+
+
+@pytest.fixture(autouse=True)
+def small_threshold(settings):
+    settings.COMPRESSION_MIN_SIZE = 200
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Compression:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_negotiation(self):
+        assert parse_accept_encoding('gzip;q=0.5, br, *;q=0') == {
+            'gzip': 0.5, 'br': 1.0, '*': 0.0,
+        }
+
+        class Request:
+            def __init__(self, header):
+                self.META = {'HTTP_ACCEPT_ENCODING': header}
+
+        assert compression.get_encoding(Request('gzip')) == 'gzip'
+        assert compression.get_encoding(Request('*')) in compression.ENCODINGS
+        assert compression.get_encoding(Request('gzip;q=0')) is None
+        assert compression.get_encoding(Request('identity')) is None
+        assert compression.get_encoding(Request('')) is None
+
+    def test_02_gzip_response(self, admin_client, client):
+        create_titles(admin_client)
+        plain = client.get(self.TITLES_URL)
+        assert 'Content-Encoding' not in plain, (
+            'Проверьте, что ответ без Accept-Encoding не сжимается.'
+        )
+        assert 'Accept-Encoding' in plain['Vary']
+
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что ответ сжимается gzip по Accept-Encoding.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'] == f'W/{plain["ETag"]}', (
+            'Проверьте, что у сжатого ответа ETag слабый.'
+        )
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_03_threshold(self, admin_client, client, settings):
+        settings.COMPRESSION_MIN_SIZE = 10_000
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы короче COMPRESSION_MIN_SIZE не сжимаются.'
+        )
+
+    def test_04_precompressed_cache(self, admin_client, client,
+                                    count_compress, settings):
+        settings.COMPRESSION_MIN_SIZE = 50
+        create_titles(admin_client)
+        for url in (self.TITLES_URL, '/api/v1/genres/'):
+            count_compress.clear()
+            plain = client.get(url).content
+            contents = [
+                client.get(url, HTTP_ACCEPT_ENCODING='gzip').content
+                for _ in range(3)
+            ]
+            assert count_compress == ['gzip'], (
+                f'Проверьте, что ответ `{url}` из кэша сжимается один раз, '
+                'а затем отдаются сохранённые сжатые байты.'
+            )
+            assert len(set(contents)) == 1
+            assert gzip.decompress(contents[0]) == plain
+
+        # Изменение данных сбрасывает и сжатую копию.
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Новый', 'slug': 'new-genre'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        content = client.get(
+            '/api/v1/genres/', HTTP_ACCEPT_ENCODING='gzip'
+        ).content
+        slugs = {
+            genre['slug'] for genre in json.loads(gzip.decompress(content))[
+                'results'
+            ]
+        }
+        assert 'new-genre' in slugs
+
+    def test_05_streaming(self, admin_client, user, user_client, moderator,
+                          moderator_client):
+        create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = '/api/v1/export/reviews/'
+        plain = b''.join(admin_client.get(url).streaming_content)
+        response = admin_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(
+            b''.join(response.streaming_content)
+        ) == plain, 'Проверьте сжатие потоковой выгрузки.'
+
+    def test_06_redoc_schema(self, client, count_compress):
+        schema = (django_settings.BASE_DIR / 'static/redoc.yaml').read_bytes()
+        response = client.get('/redoc/redoc.yaml')
+        assert response.status_code == HTTPStatus.OK
+        assert response.content == schema
+        response = client.get(
+            '/redoc/redoc.yaml', HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == schema
+        assert count_compress == [], (
+            'Проверьте, что redoc.yaml отдаётся заранее сжатым.'
+        )
+        response = client.get(
+            '/redoc/redoc.yaml', HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert b'redoc/redoc.yaml' in client.get('/redoc/').content
+
+    def test_07_brotli(self, admin_client, client, user, user_client,
+                       moderator, moderator_client):
+        create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        plain = client.get(self.TITLES_URL).content
+        response = client.get(
+            self.TITLES_URL, HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        assert response['Content-Encoding'] == 'br', (
+            'Проверьте, что при равном q предпочитается brotli.'
+        )
+        assert brotli.decompress(response.content) == plain
+
+        url = '/api/v1/export/reviews/'
+        plain = b''.join(admin_client.get(url).streaming_content)
+        response = admin_client.get(url, HTTP_ACCEPT_ENCODING='br')
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(
+            b''.join(response.streaming_content)
+        ) == plain, 'Проверьте сжатие потоковой выгрузки brotli.'
+
+        schema = (django_settings.BASE_DIR / 'static/redoc.yaml').read_bytes()
+        response = client.get('/redoc/redoc.yaml', HTTP_ACCEPT_ENCODING='br')
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == schema
+
+    def test_08_redoc_schema_is_read_only(self, client, tmp_path):
+        for method in (client.post, client.put, client.delete):
+            response = method('/redoc/redoc.yaml')
+            assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED, (
+                'Проверьте, что redoc.yaml отдаётся только на GET и HEAD.'
+            )
+        assert client.head('/redoc/redoc.yaml').status_code == HTTPStatus.OK
+
+        path = tmp_path / 'schema.yaml'
+        path.write_bytes(b'openapi: 3.0.2\n')
+        view = compression.PrecompressedFileView(path)
+        first, _ = view.load()
+        path.write_bytes(b'openapi: 3.0.3\n' * 2)
+        os.utime(path, (0, 0))
+        etag, variants = view.load()
+        assert etag != first
+        assert variants[None] == path.read_bytes(), (
+            'Проверьте, что после изменения файла отдаются новые байты '
+            'и новый ETag.'
+        )
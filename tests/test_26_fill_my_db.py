@@ -0,0 +1,118 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+CSV_FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,reader,reader@yamdb.fake,user,,,\n'
+        '101,critic,critic@yamdb.fake,moderator,,,\n'
+        '102,writer,writer@yamdb.fake,admin,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Побег из Шоушенка,1994,1\n'
+        '2,Мастер и Маргарита,1967,2\n'
+        '3,Без категории,2000,\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n3,2,2\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,"Ставлю десять звёзд!\nНа две строки.",100,10,'
+        '2019-09-24T21:08:21.567Z\n'
+        '2,1,Неплохо,101,7,2019-09-25T21:08:21.567Z\n'
+        '3,1,Так себе,102,4,2019-09-26T21:08:21.567Z\n'
+        '4,2,"Рукописи не горят",100,9,2019-09-27T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Согласен,101,2020-01-13T23:20:02.422Z\n'
+    ),
+}
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for name, content in CSV_FILES.items():
+        (tmp_path / name).write_text(content, encoding='utf-8')
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26FillMyDb:
+
+    def fill(self, path):
+        # Пачки по две строки: таблицы загружаются в несколько INSERT.
+        call_command('fill_my_db', path=path, chunk_size=2)
+
+    def test_01_import(self, csv_dir):
+        cache = caches[settings.API_CACHE_ALIAS]
+        cache.set('stale', 'response')
+        self.fill(csv_dir)
+
+        assert User.objects.count() == 3
+        assert Category.objects.count() == 2
+        assert Genre.objects.count() == 2
+        assert Title.objects.count() == 3
+        assert Review.objects.count() == 4
+        assert Comment.objects.count() == 1
+        assert Title.objects.get(pk=3).category is None, (
+            'Проверьте, что пустой внешний ключ загружается как NULL.'
+        )
+        assert set(
+            Title.objects.get(pk=2).genre.values_list('slug', flat=True)
+        ) == {'drama', 'comedy'}
+        assert Review.objects.get(pk=1).text == (
+            'Ставлю десять звёзд!\nНа две строки.'
+        )
+        assert User.objects.get(username='critic').role == User.MODERATOR
+
+        ratings = {
+            title.pk: (title.score_sum, title.review_count)
+            for title in Title.objects.all()
+        }
+        assert ratings == {1: (21, 3), 2: (9, 1), 3: (0, 0)}, (
+            'Проверьте, что после загрузки рейтинги пересчитываются.'
+        )
+        assert cache.get('stale') is None, (
+            'Проверьте, что после загрузки кэш ответов API сбрасывается.'
+        )
+
+    @pytest.mark.parametrize('bad_row', (
+        # Несуществующее произведение.
+        '5,99,Мимо,100,5,2019-09-28T21:08:21.567Z\n',
+        # Лишняя колонка.
+        '5,2,Мимо,100,5,2019-09-28T21:08:21.567Z,лишнее\n',
+    ))
+    def test_02_failure_rolls_back_table(self, csv_dir, bad_row):
+        with open(csv_dir / 'review.csv', 'a', encoding='utf-8') as file:
+            file.write(bad_row)
+
+        with pytest.raises(CommandError, match='review.csv'):
+            self.fill(csv_dir)
+
+        assert Review.objects.count() == 0, (
+            'Проверьте, что при ошибке загрузка таблицы откатывается '
+            'целиком, включая уже записанные пачки.'
+        )
+        assert Comment.objects.count() == 0, (
+            'Проверьте, что после ошибки загрузка останавливается.'
+        )
+        assert Title.objects.count() == 3, (
+            'Проверьте, что таблицы, загруженные до ошибки, сохраняются.'
+        )
+
+    def test_03_missing_files_are_skipped(self, csv_dir):
+        (csv_dir / 'comments.csv').unlink()
+        (csv_dir / 'genre_title.csv').unlink()
+        self.fill(csv_dir)
+
+        assert Review.objects.count() == 4
+        assert Comment.objects.count() == 0
+        assert not Title.genre.through.objects.exists()